@@ -1,18 +1,37 @@
-from flask import Flask, render_template, redirect, url_for, flash, request, session, jsonify
+from flask import Flask, render_template, redirect, url_for, flash, request, session, jsonify, Response, stream_with_context, g
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_wtf import CSRFProtect
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import timedelta
 import os
 import json
-import re
-from models import db, User, Resume, AnalysisResult, CoverLetter
+import time
+import click
+from models import (db, User, Resume, AnalysisResult, CoverLetter, InterviewPrep, Job, LoginFailure,
+                    upgrade_schema, apply_sqlite_pragmas)
+from utils.job_queue import job_queue
+from utils.pagination import keyset_page
+from utils.page_cache import page_cache
+from utils.search import search_index, document_text
+from utils.identity import identity_cache, SessionUser
+from utils.passwords import password_hasher, login_attempts, HashingBusy, TooManyAttempts
+from utils.assets import assets
+from utils.compression import response_compressor
+from utils.logging_config import configure_logging
+from utils.metrics import registry, timed, http_request_seconds
 
 # Step 1: Create the Flask app
 app = Flask(__name__)
 app.config.from_object('config.Config')  # Load config
+configure_logging(app.config['LOG_LEVEL'], app.config['LOG_FORMAT'])
 
 # Step 2: Initialize CSRF and Login Manager
+@app.before_request
+def allow_batch_uploads():
+    # Registered before CSRFProtect, whose check parses the body under MAX_CONTENT_LENGTH
+    if request.endpoint == 'create_batch':
+        request.max_content_length = app.config['BATCH_MAX_BYTES']
+
+
 csrf = CSRFProtect(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -24,11 +43,127 @@ from models import db, User, Resume  # Resume added
 
 # Step 4: Initialize the database with the app
 db.init_app(app)
+with app.app_context():
+    apply_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
+login_attempts.init_app(app, db, LoginFailure)  # failed sign-ins, counted per LOGIN_ATTEMPTS_BACKEND
+
+# Step 5: Background job queue (handlers live in tasks.py)
+job_queue.init_app(app)
+import tasks  # noqa: F401  (registers job handlers)
+
+# Step 6: Rendered-page cache, invalidated whenever a commit touches a user's data
+def data_owner(obj):
+    if isinstance(obj, User):
+        return obj.id
+    if isinstance(obj, AnalysisResult):
+        return obj.resume.user_id if obj.resume else None
+    return obj.user_id
+
+
+page_cache.init_app(app)
+page_cache.watch(db.session, (User, Resume, AnalysisResult, CoverLetter, InterviewPrep), owner=data_owner)
+
+
+# Step 7: Full-text search over generated documents, updated on insert/update/delete
+def search_document(row):
+    return {
+        "doc_id": row.id,
+        "user_id": row.user_id,
+        "created_at": row.created_at,
+        "job_title": row.job_title,
+        "job_description": row.job_description,
+        "content": document_text(row.content),
+    }
+
+
+search_index.init_app(app, db)
+search_index.watch('cover_letter', CoverLetter, search_document)
+search_index.watch('interview_prep', InterviewPrep, search_document)
+
+
+# Step 8: Metrics (GET /metrics): per-route latency plus cache/limiter state read at scrape time
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        # Streamed bodies (SSE) are timed until their first byte is ready
+        http_request_seconds.observe(time.perf_counter() - started, endpoint=request.endpoint or 'unmatched',
+                                     method=request.method, status=response.status_code)
+    return response
+
+
+def gemini_stats_for(section):
+    from utils.gemini_client import get_stats
+    return get_stats().get(section, {})
+
+
+def page_cache_hit_ratio(stats):
+    lookups = sum(stats.values())
+    return round((stats['hits'] + stats['not_modified']) / lookups, 4) if lookups else 0.0
+
+
+registry.gauge('smartcareer_gemini_cache_hit_ratio', "Gemini response cache hit ratio since start.",
+               lambda: gemini_stats_for('cache').get('hit_ratio'))
+registry.gauge('smartcareer_gemini_cache_lookups', "Gemini response cache lookups by result.",
+               lambda: {result: count for result, count in gemini_stats_for('cache').items()
+                        if result in ('memory_hits', 'disk_hits', 'misses')}, labels=('result',))
+registry.gauge('smartcareer_gemini_in_flight', "Gemini requests currently in flight.",
+               lambda: gemini_stats_for('limiter').get('in_flight'))
+registry.gauge('smartcareer_gemini_breaker_open', "1 while the Gemini circuit breaker is not closed.",
+               lambda: int(gemini_stats_for('limiter').get('breaker_state', 'closed') != 'closed'))
+registry.gauge('smartcareer_gemini_coalesced', "Gemini calls answered by an identical in-flight call.",
+               lambda: gemini_stats_for('single_flight').get('coalesced'))
+registry.gauge('smartcareer_page_cache_requests', "Rendered-page cache lookups by result.",
+               page_cache.get_stats, labels=('result',))
+registry.gauge('smartcareer_password_hash_operations', "Password hashes computed, verified or turned away.",
+               lambda: {kind: count for kind, count in password_hasher.get_stats().items()
+                        if kind in ('hashed', 'verified', 'rejected_busy')}, labels=('kind',))
+registry.gauge('smartcareer_page_cache_hit_ratio', "Rendered-page cache hit ratio (304s count as hits).",
+               lambda: page_cache_hit_ratio(page_cache.get_stats()))
+
+
+# Step 9: Identity cache: current_user (with the current resume id) without per-request queries
+def load_identity(user_id):
+    row = (db.session.query(User.id, User.email, db.func.min(Resume.id))
+           .outerjoin(Resume, db.and_(Resume.user_id == User.id, Resume.batch_run_id.is_(None)))
+           .filter(User.id == user_id)
+           .group_by(User.id, User.email)
+           .first())
+    return SessionUser(*row) if row else None
+
+
+def cached_identity(user_id):
+    # Keyed to the shared page-cache version, so writes committed by other processes reload it
+    return identity_cache.get(user_id, load_identity, version=page_cache.version(user_id))
+
+
+identity_cache.init_app(app)
+page_cache.on_invalidate(identity_cache.invalidate)  # same commit hook as the page cache
+registry.gauge('smartcareer_identity_cache_requests', "Identity cache lookups by result.",
+               lambda: {result: identity_cache.get_stats()[result] for result in ('hits', 'misses')},
+               labels=('result',))
+
+# Step 10: Fingerprinted static assets (asset_url() in templates) and compressed HTML/JSON responses
+assets.init_app(app)
+response_compressor.init_app(app)
+
 
 # User loader for Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return cached_identity(int(user_id))
+
+
+def current_resume():
+    """The current user's resume row, looked up by primary key (None if there is none)."""
+    if current_user.resume_id is None:
+        return None
+    return db.session.get(Resume, current_user.resume_id)
 
 
 # Routes
@@ -50,10 +185,15 @@ def register():
             return render_template('auth/register.html', form=form)
 
         user = User(email=email)
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except HashingBusy as e:
+            flash(str(e), "error")
+            return render_template('auth/register.html', form=form), 503
 
         db.session.add(user)
         db.session.commit()
+        identity_cache.invalidate(user.id)
 
         flash("Account created! Please log in.", "success")
         return redirect(url_for('login'))
@@ -69,13 +209,29 @@ def login():
         email = form.email.data
         password = form.password.data
 
-        user = User.query.filter_by(email=email).first()
-        if user and user.check_password(password):
-            login_user(user)
+        # Failed attempts are limited per account; hashing runs on a bounded pool
+        account = email.strip().lower()
+        try:
+            login_attempts.check(account)
+            user = User.query.filter_by(email=email).first()
+            valid = user is not None and user.check_password(password)
+        except TooManyAttempts as e:
+            flash(str(e), "error")
+            return render_template('auth/login.html', form=form), 429, {'Retry-After': str(int(e.retry_after) + 1)}
+        except HashingBusy as e:
+            flash(str(e), "error")
+            return render_template('auth/login.html', form=form), 503, {'Retry-After': '1'}
+
+        if valid:
+            login_attempts.reset(account)
+            if db.session.dirty:
+                db.session.commit()  # password re-hashed with the current parameters
+            login_user(cached_identity(user.id))
             session.permanent = True
             next_page = request.args.get('next')
             return redirect(next_page or url_for('dashboard'))
         else:
+            login_attempts.failure(account)
             flash("Invalid email or password.", "error")
 
     return render_template('auth/login.html', form=form)
@@ -84,6 +240,7 @@ def login():
 @app.route('/logout')
 @login_required
 def logout():
+    identity_cache.invalidate(current_user.id)
     logout_user()
     flash("You have been logged out.", "info")
     return redirect(url_for('index'))
@@ -92,7 +249,19 @@ def logout():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    return render_template('dashboard.html')
+    # One COUNT query instead of loading every row through the relationships
+    counts = db.session.query(
+        db.select(db.func.count(CoverLetter.id)).where(CoverLetter.user_id == current_user.id).scalar_subquery(),
+        db.select(db.func.count(InterviewPrep.id)).where(InterviewPrep.user_id == current_user.id).scalar_subquery(),
+        db.select(db.func.count(Resume.id)).where(Resume.user_id == current_user.id,
+                                                  Resume.batch_run_id.is_(None)).scalar_subquery()
+    ).one()
+    return render_template(
+        'dashboard.html',
+        cover_letter_count=counts[0],
+        interview_prep_count=counts[1],
+        resume_count=counts[2]
+    )
 
 
 # ===========================
@@ -102,10 +271,7 @@ def dashboard():
 @login_required
 def resume_analysis():
     from forms import ResumeUploadForm
-    from utils.pdf_parser import extract_text_from_pdf
-    from utils.gemini_client import analyze_resume
-    import os
-    import re
+    from utils.file_store import store_upload, UploadRejected
 
     form = ResumeUploadForm()
 
@@ -120,84 +286,64 @@ def resume_analysis():
         if not file.filename.endswith('.pdf'):
             return jsonify({"error": "Only PDFs allowed"}), 400
 
-        upload_dir = os.path.join('uploads', str(current_user.id))
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = os.path.join(upload_dir, file.filename)
-        file.save(file_path)
-
+        # Validated while streaming to a temp file, then kept once on disk by content hash
         try:
-            raw_text = extract_text_from_pdf(file_path)
-            ai_raw = analyze_resume(raw_text)
-
-            # Parse AI JSON
-            try:
-                ai_data = json.loads(ai_raw)
-            except json.JSONDecodeError:
-                match = re.search(r'\{.*\}', ai_raw, re.DOTALL)
-                if not match:
-                    raise ValueError("No valid JSON in AI response")
-                ai_data = json.loads(match.group())
-
-            # Save to DB
-            resume = Resume.query.filter_by(user_id=current_user.id).first()
-            if resume:
-                resume.filename = file.filename
-                resume.content = raw_text
-            else:
-                resume = Resume(filename=file.filename, content=raw_text, user_id=current_user.id)
-                db.session.add(resume)
-            db.session.flush()
-
-            analysis = AnalysisResult.query.filter_by(resume_id=resume.id).first()
-            if not analysis:
-                analysis = AnalysisResult(resume_id=resume.id)
-                db.session.add(analysis)
-
-            analysis.ats_score = ai_data.get("ats_score")
-            analysis.key_skills = json.dumps(ai_data.get("key_skills", []))
-            analysis.strengths = json.dumps(ai_data.get("strengths", []))
-            analysis.missing_sections = json.dumps(ai_data.get("missing_sections", []))
-            analysis.improvements = json.dumps(ai_data.get("improvements", []))
-
+            with timed("upload_save"):
+                content_hash, file_path = store_upload(
+                    file,
+                    max_bytes=app.config['RESUME_MAX_BYTES'],
+                    max_pages=app.config['RESUME_MAX_PAGES']
+                )
+        except UploadRejected as e:
+            return jsonify({"error": str(e)}), e.status_code
+
+        # Same file as the current resume: keep the existing text and analysis
+        resume = (Resume.current(current_user.id)
+                  .options(db.joinedload(Resume.analysis_results))
+                  .first())
+        if resume and resume.content_hash == content_hash and resume.analysis_results:
+            resume.filename = file.filename
             db.session.commit()
+            return jsonify({"success": True, "reused": True}), 200
 
-            # ✅ Always return JSON for AJAX
-            return jsonify({"success": True}), 200
-
-        except Exception as e:
-            db.session.rollback()
-            print("Error:", str(e))  # Log to console
-            return jsonify({"error": str(e)}), 500
+        # Extraction + analysis run in the background; client polls the job
+        job = job_queue.enqueue('resume_analysis', current_user.id, {
+            "file_path": file_path,
+            "filename": file.filename,
+            "content_hash": content_hash
+        })
+        return job_accepted(job)
 
     # Handle GET request
-    existing_resume = Resume.query.filter_by(user_id=current_user.id).first()
-    return render_template('resume_analysis.html', form=form, has_resume=existing_resume is not None)
+    return render_template('resume_analysis.html', form=form, has_resume=current_user.resume_id is not None)
 
 
 @app.route('/analysis/view')
 @login_required
+@page_cache.cached
 def view_analysis():
     from models import Resume, AnalysisResult
-    import json
 
-    # Get the latest resume and its analysis
-    resume = Resume.query.filter_by(user_id=current_user.id).first()
+    # Get the latest resume and its analysis in one query
+    resume = (Resume.current(current_user.id)
+              .options(db.joinedload(Resume.analysis_results))
+              .first())
     if not resume:
         flash("No resume found.", "error")
         return redirect(url_for('resume_analysis'))
 
-    analysis = AnalysisResult.query.filter_by(resume_id=resume.id).first()
+    analysis = resume.analysis_results
     if not analysis:
         flash("No analysis available for this resume.", "error")
         return redirect(url_for('resume_analysis'))
 
-    # Convert DB fields back to Python lists
+    # JSON columns come back as Python lists
     feedback = {
         "ats_score": analysis.ats_score,
-        "key_skills": json.loads(analysis.key_skills),
-        "strengths": json.loads(analysis.strengths),
-        "missing_sections": json.loads(analysis.missing_sections),
-        "improvements": json.loads(analysis.improvements)
+        "key_skills": analysis.key_skills or [],
+        "strengths": analysis.strengths or [],
+        "missing_sections": analysis.missing_sections or [],
+        "improvements": analysis.improvements or []
     }
 
     return render_template(
@@ -216,13 +362,9 @@ def view_analysis():
 @login_required
 def cover_letter():
     from forms import CoverLetterForm
-    from models import Resume, CoverLetter
-    from utils.gemini_client import generate_cover_letter
-    import json
 
     # Check if user has a resume
-    resume = Resume.query.filter_by(user_id=current_user.id).first()
-    if not resume:
+    if current_user.resume_id is None:
         if request.is_json:
             return jsonify({"error": "Resume required"}), 400
         return render_template('cover_letter.html', has_resume=False)
@@ -235,39 +377,103 @@ def cover_letter():
         if not job_title or not job_description:
             return jsonify({"error": "Job title and description are required"}), 400
 
+        job = job_queue.enqueue('cover_letter', current_user.id, {
+            "job_title": job_title,
+            "job_description": job_description,
+            "company_info": company_info,
+            "resume_id": current_user.resume_id
+        })
+        return job_accepted(job)
+
+    # GET request
+    return render_template('cover_letter.html', has_resume=True)
+
+@app.route('/cover-letter/stream', methods=['POST'])
+@login_required
+def stream_cover_letter():
+    """
+    Streams the cover letter to the browser as server-sent events while Gemini generates it.
+    Events: default "data" events carry {"text": chunk}; a final "done" event carries
+    {"letter_id": ...}; failures send an "error" event. The letter is saved once complete.
+    """
+    from utils.gemini_client import stream_cover_letter as stream_letter
+
+    resume = current_resume()
+    if not resume:
+        return jsonify({"error": "Resume required"}), 400
+
+    job_title = request.form.get('job_title')
+    job_description = request.form.get('job_description')
+    company_info = request.form.get('company_info') or "Not provided"
+
+    if not job_title or not job_description:
+        return jsonify({"error": "Job title and description are required"}), 400
+
+    user_id, resume_id, resume_text = current_user.id, resume.id, resume.content
+
+    def sse(data, event=None):
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    def generate():
+        chunks = []
         try:
-            # Generate AI cover letter
-            letter = generate_cover_letter(resume.content, job_description, company_info)
+            for chunk in stream_letter(resume_text, job_description, company_info):
+                chunks.append(chunk)
+                yield sse({"text": chunk})
 
-            # Save to DB
             new_letter = CoverLetter(
                 job_title=job_title,
                 job_description=job_description,
                 company_info=company_info,
-                content=letter,
-                user_id=current_user.id,
-                resume_id=resume.id
+                content="".join(chunks),
+                user_id=user_id,
+                resume_id=resume_id
             )
             db.session.add(new_letter)
             db.session.commit()
-
-            return jsonify({
-                "success": True,
-                "letter": letter
-            }), 200
-
+            yield sse({"letter_id": new_letter.id}, event="done")
         except Exception as e:
             db.session.rollback()
-            return jsonify({"error": str(e)}), 500
+            yield sse({"error": str(e)}, event="error")
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # disable proxy buffering (nginx)
+    })
+
+def cover_letter_page(cursor):
+    # List pages only need titles and dates; content/job_description stay in the database
+    query = (CoverLetter.query
+             .options(db.load_only(CoverLetter.id, CoverLetter.job_title,
+                                   CoverLetter.company_info, CoverLetter.created_at))
+             .filter_by(user_id=current_user.id))
+    return keyset_page(query, CoverLetter, cursor, app.config['HISTORY_PAGE_SIZE'])
 
-    # GET request
-    return render_template('cover_letter.html', has_resume=True)
 
 @app.route('/cover-letters')
 @login_required
+@page_cache.cached
 def view_cover_letters():
-    letters = CoverLetter.query.filter_by(user_id=current_user.id).order_by(CoverLetter.created_at.desc()).all()
-    return render_template('view_cover_letters.html', cover_letters=letters)
+    letters, next_cursor = cover_letter_page(request.args.get('cursor'))
+    return render_template('view_cover_letters.html', cover_letters=letters,
+                           next_cursor=next_cursor, is_first_page=not request.args.get('cursor'))
+
+
+@app.route('/api/cover-letters')
+@login_required
+@page_cache.cached
+def api_cover_letters():
+    letters, next_cursor = cover_letter_page(request.args.get('cursor'))
+    return jsonify({
+        "items": [{
+            "id": letter.id,
+            "job_title": letter.job_title,
+            "company_info": letter.company_info,
+            "created_at": letter.created_at.isoformat() if letter.created_at else None
+        } for letter in letters],
+        "next_cursor": next_cursor
+    })
 
 @app.route('/cover-letter/view/<int:letter_id>')
 @login_required
@@ -294,14 +500,8 @@ def delete_cover_letter(letter_id):
 @app.route('/interview-prep', methods=['GET', 'POST'])
 @login_required
 def interview_prep():
-    from models import Resume, InterviewPrep
-    from utils.gemini_client import generate_interview_prep
-    import json
-    import re
-
     # Check if user has a resume
-    resume = Resume.query.filter_by(user_id=current_user.id).first()
-    if not resume:
+    if current_user.resume_id is None:
         if request.is_json:
             return jsonify({"error": "Resume required. Please upload your resume first."}), 400
         return render_template('interview_prep.html', has_resume=False)
@@ -316,89 +516,47 @@ def interview_prep():
         if not job_description:
             return jsonify({"error": "Job description is required."}), 400
 
-        try:
-            # Parse options
-            try:
-                options = json.loads(options_json)
-            except json.JSONDecodeError:
-                options = []
-
-            # Call AI
-            raw_ai_output = generate_interview_prep(
-                resume_text=resume.content,
-                job_title=job_title,
-                job_description=job_description,
-                options=options
-            )
-
-            # Log raw output
-            print("\n=== Raw AI Output ===")
-            print(raw_ai_output)
-            print("=====================\n")
-
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', raw_ai_output, re.DOTALL)
-            if not json_match:
-                raise ValueError("No JSON found in AI response")
-
-            json_str = json_match.group()
-
-            # Try parsing
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                print("JSON parse failed. Trying repair-json...")
-                try:
-                    from repair_json import repair_json
-                    fixed = repair_json(json_str)
-                    data = json.loads(fixed)
-                    print("✅ repair_json fixed it!")
-                except ImportError:
-                    raise ValueError("repair-json not installed and JSON is invalid")
-
-            # ✅ Make fields optional with defaults
-            final_data = {
-                "job_title": data.get("job_title", job_title),
-                "company": data.get("company", "the company"),
-                "summary": data.get("summary", "Preparation guide generated by AI."),
-                "sections": data.get("sections", []),  # ✅ Now optional
-                "key_skills": data.get("key_skills", []),
-                "behavioral_questions": data.get("behavioral_questions", []),
-                "questions_to_ask": data.get("questions_to_ask", []),
-                "final_tip": data.get("final_tip", "Practice your answers out loud and tailor them to your own experiences.")
-            }
-
-            # ✅ Save to DB
-            new_prep = InterviewPrep(
-                job_title=final_data["job_title"],
-                job_description=job_description,
-                options=options_json,
-                content=json.dumps(final_data, ensure_ascii=False),
-                user_id=current_user.id,
-                resume_id=resume.id
-            )
-            db.session.add(new_prep)
-            db.session.commit()
-
-            return jsonify({
-                "success": True,
-                "content": json.dumps(final_data, ensure_ascii=False)
-            }), 200
-
-        except Exception as e:
-            db.session.rollback()
-            print(f"Interview Prep Error: {str(e)}")
-            return jsonify({"error": f"Failed to generate interview prep: {str(e)}"}), 500
+        job = job_queue.enqueue('interview_prep', current_user.id, {
+            "job_title": job_title,
+            "job_description": job_description,
+            "options": options_json,
+            "resume_id": current_user.resume_id
+        })
+        return job_accepted(job)
 
     # GET request
     return render_template('interview_prep.html', has_resume=True)
 
+def interview_prep_page(cursor):
+    # List pages only need titles and dates; the prep JSON and job_description stay in the database
+    query = (InterviewPrep.query
+             .options(db.load_only(InterviewPrep.id, InterviewPrep.job_title, InterviewPrep.created_at))
+             .filter_by(user_id=current_user.id))
+    return keyset_page(query, InterviewPrep, cursor, app.config['HISTORY_PAGE_SIZE'])
+
+
 @app.route('/interview-preps')
 @login_required
+@page_cache.cached
 def view_interview_preps():
-    from models import InterviewPrep
-    preps = InterviewPrep.query.filter_by(user_id=current_user.id).order_by(InterviewPrep.created_at.desc()).all()
-    return render_template('view_interview_preps.html', interview_preps=preps)
+    preps, next_cursor = interview_prep_page(request.args.get('cursor'))
+    return render_template('view_interview_preps.html', interview_preps=preps,
+                           next_cursor=next_cursor, is_first_page=not request.args.get('cursor'))
+
+
+@app.route('/api/interview-preps')
+@login_required
+@page_cache.cached
+def api_interview_preps():
+    preps, next_cursor = interview_prep_page(request.args.get('cursor'))
+    return jsonify({
+        "items": [{
+            "id": prep.id,
+            "job_title": prep.job_title,
+            "created_at": prep.created_at.isoformat() if prep.created_at else None
+        } for prep in preps],
+        "next_cursor": next_cursor
+    })
 
 
 @app.route('/interview-prep/view/<int:prep_id>')
@@ -406,12 +564,9 @@ def view_interview_preps():
 def view_interview_prep(prep_id):
     from models import InterviewPrep
     prep = InterviewPrep.query.filter_by(id=prep_id, user_id=current_user.id).first_or_404()
-    try:
-        import json
-        data = json.loads(prep.content)
-        return jsonify(data)
-    except Exception as e:
+    if not isinstance(prep.content, dict):
         return jsonify({"error": "Could not parse content"}), 500
+    return jsonify(prep.content)
 
 
 @app.route('/interview-prep/delete/<int:prep_id>', methods=['GET'])
@@ -425,9 +580,271 @@ def delete_interview_prep(prep_id):
     return redirect(url_for('view_interview_preps'))
 
 
+@app.errorhandler(413)
+def request_too_large(e):
+    limit_mb = request.max_content_length // (1024 * 1024)
+    if request.endpoint == 'create_batch':
+        return jsonify({"error": f"Batch archive exceeds the {limit_mb}MB batch limit (BATCH_MAX_BYTES)."}), 413
+    return jsonify({"error": f"File exceeds the {limit_mb}MB limit."}), 413
+
+
+# ===========================
+# Background Jobs
+# ===========================
+
+def job_accepted(job):
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for('job_status', job_id=job.id)
+    }), 202
+
+
+@app.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = Job.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
+    return jsonify(job.to_dict())
+
+
+# ===========================
+# Document Search
+# ===========================
+
+@app.route('/api/search')
+@login_required
+def search_documents():
+    """Ranked full-text search over the user's cover letters and interview preps, with snippets."""
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('kind') or None
+    if kind not in (None, 'cover_letter', 'interview_prep'):
+        return jsonify({"error": "kind must be cover_letter or interview_prep"}), 400
+    page = max(1, request.args.get('page', 1, type=int))
+    size = app.config['HISTORY_PAGE_SIZE']
+
+    hits = search_index.search(current_user.id, query, kind, limit=size + 1, offset=(page - 1) * size)
+    for hit in hits:
+        if hit['kind'] == 'cover_letter':
+            hit['url'] = url_for('view_cover_letter', letter_id=hit['id'])
+        else:
+            hit['url'] = url_for('view_interview_prep', prep_id=hit['id'])
+    return jsonify({
+        "items": hits[:size],
+        "page": page,
+        "next_page": page + 1 if len(hits) > size else None
+    })
+
+
+# ===========================
+# Skill Match Pre-check
+# ===========================
+
+@app.route('/api/skill-match', methods=['POST'])
+@login_required
+def skill_match():
+    """Instant local pre-check of the current resume against a job description (no Gemini call)."""
+    from utils.skill_match import get_vocabulary, match_job
+
+    resume = current_resume()
+    if not resume:
+        return jsonify({"error": "Resume required"}), 400
+    job_description = request.form.get('job_description', '').strip()
+    if not job_description:
+        return jsonify({"error": "Job description is required"}), 400
+
+    job_text = f"{request.form.get('job_title', '')}\n{job_description}"
+    return jsonify(match_job(resume.content, job_text, get_vocabulary()))
+
+
+# ===========================
+# Gemini Usage
+# ===========================
+
+@app.route('/api/gemini/stats')
+@login_required
+def gemini_stats():
+    from utils.gemini_client import get_stats
+    return jsonify(get_stats())
+
+
+# ===========================
+# Metrics
+# ===========================
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition; requires `Authorization: Bearer <METRICS_TOKEN>` when that is set."""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return Response("Unauthorized\n", status=401, mimetype='text/plain')
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+# ===========================
+# Batch Resume Analysis
+# ===========================
+
+@app.route('/api/batch', methods=['POST'])
+@login_required
+def create_batch():
+    """
+    Accepts a zip of PDFs ("archive"), registers each as a batch item and analyses
+    them in a background job. Poll /api/batch/<run_id> or stream /api/batch/<run_id>/events.
+    """
+    import tempfile
+    from models import BatchRun
+    from utils.batch import create_run
+
+    archive = request.files.get('archive')
+    if not archive or not archive.filename.lower().endswith('.zip'):
+        return jsonify({"error": "Upload a .zip of PDF resumes as 'archive'."}), 400
+
+    with tempfile.NamedTemporaryFile(suffix='.zip') as tmp:
+        archive.save(tmp)
+        tmp.flush()
+        try:
+            run = create_run(current_user.id, tmp.name,
+                             max_bytes=app.config['RESUME_MAX_BYTES'],
+                             max_pages=app.config['RESUME_MAX_PAGES'])
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
+    run.source = archive.filename
+    db.session.commit()
+
+    concurrency = request.form.get('concurrency', 4, type=int)
+    concurrency = max(1, min(concurrency, app.config['BATCH_MAX_CONCURRENCY']))
+    job = job_queue.enqueue('batch_analysis', current_user.id, {"run_id": run.id, "concurrency": concurrency})
+    return jsonify({
+        "run_id": run.id,
+        "job_id": job.id,
+        "progress_url": url_for('batch_progress', run_id=run.id),
+        "events_url": url_for('batch_events', run_id=run.id)
+    }), 202
+
+
+@app.route('/api/batch/<int:run_id>')
+@login_required
+def batch_progress(run_id):
+    from models import BatchRun
+    run = BatchRun.query.filter_by(id=run_id, user_id=current_user.id).first_or_404()
+    return jsonify(run.progress())
+
+
+@app.route('/api/batch/<int:run_id>/events')
+@login_required
+def batch_events(run_id):
+    """
+    Server-sent events: one "item" event per finished file, then "done" (or "failed") with
+    the totals. The stream closes after BATCH_EVENTS_MAX_SECONDS; clients reconnect to resume.
+    """
+    from models import BatchRun, BatchItem
+    import time
+
+    BatchRun.query.filter_by(id=run_id, user_id=current_user.id).first_or_404()
+    deadline = time.monotonic() + app.config['BATCH_EVENTS_MAX_SECONDS']
+
+    def generate():
+        reported = set()
+        while True:
+            run = db.session.get(BatchRun, run_id)
+            finished = (BatchItem.query
+                        .filter(BatchItem.run_id == run_id, BatchItem.status != 'pending')
+                        .with_entities(BatchItem.id, BatchItem.filename, BatchItem.status, BatchItem.error)
+                        .all())
+            for item_id, filename, status, error in finished:
+                if item_id not in reported:
+                    reported.add(item_id)
+                    data = {"filename": filename, "status": status, "error": error}
+                    yield f"event: item\ndata: {json.dumps(data)}\n\n"
+            if run is None or run.status in ('done', 'failed'):
+                progress = run.progress() if run else {"run_id": run_id, "status": "failed"}
+                yield f"event: {progress['status']}\ndata: {json.dumps(progress)}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                return
+            db.session.remove()  # end the read transaction so new commits are visible
+            time.sleep(1)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.cli.command('batch-analyze')
+@click.argument('source', required=False)
+@click.option('--user', 'email', required=True, help="Email of the account that owns the results.")
+@click.option('--concurrency', default=4, show_default=True, type=click.IntRange(min=1),
+              help="Parallel extractions/Gemini calls.")
+@click.option('--resume', 'resume_run', type=int, help="Continue an interrupted run by id instead of starting one.")
+def batch_analyze_command(source, email, concurrency, resume_run):
+    """Analyse every PDF in SOURCE (a directory or .zip) and store the results."""
+    from models import BatchRun
+    from utils.batch import create_run, run_batch
+
+    user = User.query.filter_by(email=email).first()
+    if not user:
+        raise click.ClickException(f"No user with email {email}")
+
+    if resume_run:
+        run = BatchRun.query.filter_by(id=resume_run, user_id=user.id).first()
+        if not run:
+            raise click.ClickException(f"No batch run {resume_run} for {email}")
+    elif source:
+        try:
+            run = create_run(user.id, os.path.abspath(source),
+                             max_bytes=app.config['RESUME_MAX_BYTES'],
+                             max_pages=app.config['RESUME_MAX_PAGES'])
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    else:
+        raise click.UsageError("Give a SOURCE directory/zip or --resume RUN_ID.")
+
+    click.echo(f"Batch run {run.id}: {run.progress()['pending']} file(s) to analyse")
+
+    def on_progress(item, progress):
+        line = f"[{progress['done'] + progress['failed']}/{progress['total']}] {item.status:6} {item.filename}"
+        if item.error:
+            line += f" ({item.error})"
+        click.echo(line)
+
+    summary = run_batch(run.id, concurrency=concurrency, on_progress=on_progress)
+    click.echo(
+        f"Done: {summary['done']} analysed, {summary['failed']} failed in "
+        f"{summary['elapsed_seconds']}s ({summary['files_per_min']} files/min)."
+    )
+    if summary['failed']:
+        click.echo(f"Retry failed files with: flask batch-analyze --user {email} --resume {run.id}")
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Fingerprint and precompress static/ into static/dist and rewrite the manifest."""
+    manifest = assets.build(app)
+    compressed = sum(len(encodings) for encodings in manifest['encodings'].values())
+    click.echo(f"Built {len(manifest['assets'])} asset(s), {compressed} precompressed variant(s).")
+
+
+@app.cli.command('resume-jobs')
+def resume_jobs_command():
+    """Run jobs left queued, or running past their lease, without waiting for a server to start."""
+    count = job_queue.resume_pending()
+    if job_queue.executor is not None:
+        job_queue.executor.shutdown(wait=True)
+    click.echo(f"Resumed {count} job(s).")
+
+
+@app.cli.command('reindex-search')
+def reindex_search_command():
+    """Rebuild the full-text search index from the cover letter and interview prep tables."""
+    count = search_index.rebuild()
+    click.echo(f"Indexed {count} document(s) with the {search_index.backend.name} backend.")
+
+
 # Create tables
 with app.app_context():
     db.create_all()
+    upgrade_schema()
+    search_index.ensure_index()
 
 
 # Run the app
@@ -0,0 +1,59 @@
+"""
+Compares call latency with and without the pooled keep-alive session.
+
+    python -m benchmarks.bench_http_pool --requests 200 --concurrency 8
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_gemini import StubGeminiServer
+from utils.http_client import post_json, reset_session
+
+PAYLOAD = {"contents": [{"parts": [{"text": "ping"}]}]}
+
+
+def run(url, total, concurrency, pooled):
+    reset_session()
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        response = post_json(url, PAYLOAD, pooled=pooled)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "pooled": pooled,
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubGeminiServer(latency=args.latency).start()
+    url = server.base_url + "/v1/models/stub:generateContent"
+    try:
+        for pooled in (False, True):
+            print(run(url, args.requests, args.concurrency, pooled))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Interview prep wall-clock time: one combined prompt vs. the concurrent per-section
+prompts of gemini_client.generate_interview_prep, against the local stub with a
+latency proportional to the reply length (a stand-in for generation speed).
+
+    python -m benchmarks.bench_interview_fanout --tokens-per-second 80
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.stub_gemini import StubGeminiServer
+
+RESUME = "Backend engineer. Python, Flask, PostgreSQL, Docker, AWS. Led a team of four. " * 40
+JOB = "We are hiring a senior Python engineer to build Flask APIs on AWS with PostgreSQL. " * 20
+
+SECTION_REPLIES = {
+    "final_tip": {"job_title": "Senior Python Engineer", "company": "ACME", "summary": "A backend role.",
+                  "final_tip": "Practise out loud."},
+    "key_skills:": {"key_skills": [{"skill": f"Skill {i}", "advice": "Concrete advice for this skill. " * 3}
+                                   for i in range(5)]},
+    "behavioral_questions:": {"behavioral_questions": [{"question": f"Question {i}?",
+                                                        "tip": "Use the STAR method and quantify. " * 3}
+                                                       for i in range(5)]},
+    "questions_to_ask:": {"questions_to_ask": [f"What does success look like in the first {i} months?"
+                                               for i in range(5)]},
+}
+
+
+class GenerationStub(StubGeminiServer):
+    """Replies with the sections a prompt asks for, sleeping ~len(reply)/4 / tokens_per_second."""
+
+    def reply_for(self, prompt):
+        data = {}
+        for marker, reply in SECTION_REPLIES.items():
+            if marker in prompt:
+                data.update(reply)
+        text = json.dumps(data)
+        time.sleep(len(text) / 4 / self.tokens_per_second)
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    server = GenerationStub()
+    server.tokens_per_second = args.tokens_per_second
+    server.start()
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["GEMINI_API_BASE"] = server.base_url
+    os.environ["GEMINI_CACHE_ENABLED"] = "0"
+    from utils import gemini_client
+
+    prompts = gemini_client.build_interview_prep_prompts(RESUME, "Senior Python Engineer", JOB, ["technical"])
+    combined = "\n".join(prompts.values())  # asks for every section in one reply
+
+    serial, fanout = [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        gemini_client.call_gemini(combined, use_cache=False)
+        serial.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        replies = gemini_client.generate_interview_prep(RESUME, "Senior Python Engineer", JOB, ["technical"])
+        fanout.append(time.perf_counter() - started)
+    server.stop()
+
+    print(json.dumps({
+        "tokens_per_second": args.tokens_per_second,
+        "sections": len(replies),
+        "combined_prompt_s": round(min(serial), 3),
+        "fanout_s": round(min(fanout), 3),
+        "speedup": round(min(serial) / min(fanout), 2),
+    }))
+
+
+if __name__ == "__main__":
+    main()
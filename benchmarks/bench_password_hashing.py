@@ -0,0 +1,84 @@
+"""
+Login throughput at different password-hash cost settings. A burst of concurrent
+logins goes through utils.passwords.PasswordHasher while a probe thread does small,
+request-sized bits of work; the probe's p95 shows how much the burst slows everything else.
+
+    python -m benchmarks.bench_password_hashing --logins 64 --concurrency 16 --workers 1 2
+"""
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from utils.passwords import PasswordHasher, HashingBusy
+
+METHODS = ["pbkdf2:sha256:100000", "pbkdf2:sha256:600000", "scrypt:16384:8:1", "scrypt:32768:8:1",
+           "scrypt:65536:8:1"]
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)] if ordered else None
+
+
+def probe(stop, latencies):
+    """Stands in for other requests on the worker: a little Python work every 5 ms (plus wake-up delay)."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        time.sleep(0.005)
+        sum(i * i for i in range(2000))
+        latencies.append(time.perf_counter() - started - 0.005)
+
+
+def run(method, logins, concurrency, workers):
+    pwhash = generate_password_hash("correct horse", method)
+    hasher = PasswordHasher(method, workers=workers, queue_size=logins, timeout=300)
+    durations, probe_latencies = [], []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe, args=(stop, probe_latencies))
+
+    def login(_):
+        started = time.perf_counter()
+        try:
+            assert hasher.verify(pwhash, "correct horse")
+        except HashingBusy:
+            return
+        durations.append(time.perf_counter() - started)
+
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    return {
+        "method": method,
+        "workers": workers,
+        "logins": len(durations),
+        "logins_per_s": round(len(durations) / elapsed, 1),
+        "login_p95_ms": round(p95(durations) * 1000, 1),
+        "probe_p95_ms": round(p95(probe_latencies) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--methods", nargs="+", default=METHODS)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous login requests")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 16],
+                        help="hashing pool sizes to compare (16 ~ one hash per request thread)")
+    args = parser.parse_args()
+
+    for method in args.methods:
+        for workers in args.workers:
+            print(json.dumps(run(method, args.logins, args.concurrency, workers)))
+
+
+if __name__ == "__main__":
+    main()
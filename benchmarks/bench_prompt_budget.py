@@ -0,0 +1,129 @@
+"""
+Compares prompt input size under the old fixed character slices with the
+token-budgeted compaction in utils/prompt_budget, and how many of the job
+description's terms survive in the resume text that is sent.
+
+    python -m benchmarks.bench_prompt_budget
+    python -m benchmarks.bench_prompt_budget --resume my_resume.pdf --job job.txt
+"""
+import argparse
+import json
+import random
+
+from utils import prompt_budget
+from utils.rate_limiter import estimate_tokens
+
+JOB_DESCRIPTION = """
+Senior Backend Engineer - Payments Platform
+
+We are looking for a backend engineer to build and scale our payments APIs.
+You will design PostgreSQL schemas, write Python services with Flask and Celery,
+run them on Kubernetes in AWS, and own observability with Prometheus and Grafana.
+
+Requirements:
+- 5+ years of Python, REST API design and SQL performance tuning
+- Experience with Kafka or another message queue, Redis caching, Docker and Kubernetes
+- PCI compliance, fraud detection or payments experience is a strong plus
+"""
+
+VERBS = ["Coordinated", "Maintained", "Organised", "Presented", "Supported", "Reviewed", "Planned", "Drafted"]
+OBJECTS = ["weekly stand-ups", "onboarding guides", "the office hackathon", "quarterly results",
+           "landing page copy", "vendor contracts", "training sessions", "customer feedback surveys"]
+CONTEXTS = ["with stakeholders across teams", "for new hires", "during the summer programme",
+            "for the leadership offsite", "with the marketing team", "across three regional offices"]
+RELEVANT = [
+    "Built Python Flask REST APIs serving 2k requests/sec for the payments platform",
+    "Tuned PostgreSQL queries and indexes, cutting p95 latency from 900ms to 120ms",
+    "Moved batch jobs to Celery workers on Kubernetes (AWS EKS) with Redis caching",
+    "Introduced Kafka event streaming for fraud detection and PCI audit trails",
+    "Set up Prometheus metrics and Grafana dashboards with on-call alerting",
+]
+
+
+def synthetic_resume(pages=6, seed=7):
+    """Resume text shaped like multi-page PDF extraction: repeated headers/footers, ragged spacing."""
+    rng = random.Random(seed)
+
+    def filler():
+        return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(CONTEXTS)} ({rng.randint(2012, 2024)})"
+
+    sections = [
+        ("SUMMARY", ["Engineer with 8 years of experience across product and platform teams."]),
+        ("EXPERIENCE", [filler() for _ in range(70)]),
+        ("PROJECTS", [filler() for _ in range(30)] + RELEVANT[:2]),
+        ("VOLUNTEERING", [filler() for _ in range(50)]),
+        ("EDUCATION", ["BSc Computer Science, 2014", "Relevant coursework: databases, distributed systems"]),
+        ("CERTIFICATIONS", RELEVANT[2:]),
+        ("SKILLS", ["Python, Flask, SQL, PostgreSQL, Docker, Kubernetes, AWS, Redis, Kafka"]),
+    ]
+    lines = ["Jane Doe    |   jane.doe@example.com   |  +1 555 0100", ""]
+    for heading, bullets in sections:
+        lines += ["", heading, ""]
+        lines += [f"  •   {bullet}   " for bullet in bullets]
+
+    per_page = len(lines) // pages + 1
+    out = []
+    for page in range(pages):
+        out.append("Jane Doe  -  Curriculum Vitae")
+        out += lines[page * per_page:(page + 1) * per_page]
+        out += ["", "Confidential - do not distribute", f"Page {page + 1} of {pages}", "\f"]
+    return "\n".join(out)
+
+
+def coverage(text, job_description):
+    wanted = set(prompt_budget.terms(job_description))
+    present = wanted.intersection(prompt_budget.terms(text))
+    return round(len(present) / len(wanted), 3) if wanted else 1.0
+
+
+def compare(name, resume_text, job_description, old_resume_chars, old_job_chars, resume_budget, job_budget):
+    old_resume, old_job = resume_text[:old_resume_chars], job_description[:old_job_chars]
+    new_resume = prompt_budget.compact(resume_text, resume_budget, query=job_description if job_budget else None)
+    new_job = prompt_budget.compact(job_description, job_budget) if job_budget else ""
+    if not job_budget:
+        old_job = ""
+    old_tokens = estimate_tokens(old_resume) + (estimate_tokens(old_job) if old_job else 0)
+    new_tokens = estimate_tokens(new_resume) + (estimate_tokens(new_job) if new_job else 0)
+    return {
+        "prompt": name,
+        "old_input_tokens": old_tokens,
+        "new_input_tokens": new_tokens,
+        "tokens_saved": old_tokens - new_tokens,
+        "saved_pct": round((old_tokens - new_tokens) / old_tokens * 100, 1) if old_tokens else 0.0,
+        "old_job_term_coverage": coverage(old_resume, job_description),
+        "new_job_term_coverage": coverage(new_resume, job_description),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", help="resume PDF (default: a synthetic 6-page resume)")
+    parser.add_argument("--job", help="job description text file")
+    parser.add_argument("--pages", type=int, default=6)
+    args = parser.parse_args()
+
+    if args.resume:
+        from utils.pdf_parser import extract_text_from_pdf
+        resume_text = extract_text_from_pdf(args.resume)
+    else:
+        resume_text = synthetic_resume(args.pages)
+    job_description = open(args.job).read() if args.job else JOB_DESCRIPTION
+
+    rows = [
+        compare("resume_analysis", resume_text, job_description, 10000, 0,
+                prompt_budget.ANALYSIS_RESUME_TOKENS, 0),
+        compare("cover_letter", resume_text, job_description, 8000, 5000,
+                prompt_budget.COVER_LETTER_RESUME_TOKENS, prompt_budget.COVER_LETTER_JOB_TOKENS),
+        compare("interview_prep", resume_text, job_description, 6000, 3000,
+                prompt_budget.INTERVIEW_RESUME_TOKENS, prompt_budget.INTERVIEW_JOB_TOKENS),
+    ]
+    for row in rows:
+        print(json.dumps(row))
+    total_old = sum(row["old_input_tokens"] for row in rows)
+    total_new = sum(row["new_input_tokens"] for row in rows)
+    print(json.dumps({"total_tokens_saved": total_old - total_new,
+                      "total_saved_pct": round((total_old - total_new) / total_old * 100, 1)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Scores one resume against many job descriptions with the local skill matcher
+(utils/skill_match) and compares the vectorised sparse scoring with a
+per-job pure-Python loop over the same vectors.
+
+    python -m benchmarks.bench_skill_match --jobs 10000
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+from utils.skill_match import SEED_SKILLS, SkillVocabulary, score_jobs, cosine_scores
+
+FILLER = ("we are hiring a motivated engineer to join our growing team and help customers succeed "
+          "you will collaborate with product design and operations to deliver reliable features "
+          "strong ownership clear writing and curiosity matter more than years of experience").split()
+
+RESUME = """
+Jane Doe - Backend Engineer
+Built Python and Flask REST API services on PostgreSQL and Redis, deployed with Docker and Kubernetes on AWS.
+Set up CI/CD with GitHub Actions, Prometheus and Grafana monitoring. Mentoring, Agile, Scrum.
+Skills: Python, Flask, Django, SQL, PostgreSQL, Redis, Celery, Kafka, Docker, Kubernetes, AWS, Git, Linux
+"""
+
+
+def synthetic_jobs(count, seed=11, skills_per_job=8, words_per_job=250):
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(words_per_job)]
+        for skill in rng.sample(SEED_SKILLS, skills_per_job):
+            words.insert(rng.randrange(len(words)), skill)
+        jobs.append(" ".join(words))
+    return jobs
+
+
+def python_scores(resume, jobs):
+    """The same cosine scores, one job at a time, without NumPy."""
+    resume_weights = {i: float(resume[i]) for i in resume.nonzero()[0]}
+    resume_norm = math.sqrt(sum(w * w for w in resume_weights.values()))
+    scores = []
+    for i in range(jobs.shape[0]):
+        indices, data = jobs.row(i)
+        dot = sum(w * resume_weights.get(int(j), 0.0) for j, w in zip(indices.tolist(), data.tolist()))
+        norm = math.sqrt(sum(w * w for w in data.tolist())) * resume_norm
+        scores.append(dot / norm if norm else 0.0)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=10000)
+    args = parser.parse_args()
+
+    vocabulary = SkillVocabulary(SEED_SKILLS)
+    jobs = synthetic_jobs(args.jobs)
+
+    started = time.perf_counter()
+    scores, matrix, resume = score_jobs(RESUME, jobs, vocabulary)
+    total = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vocabulary.vectorize(jobs)
+    vectorize = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cosine_scores(matrix, resume)
+    vector_scoring = time.perf_counter() - started
+
+    started = time.perf_counter()
+    loop = python_scores(resume, matrix)
+    loop_scoring = time.perf_counter() - started
+
+    top = sorted(range(len(jobs)), key=lambda i: -scores[i])[:5]
+    print(json.dumps({
+        "jobs": len(jobs),
+        "vocabulary": len(vocabulary),
+        "nonzeros": int(matrix.data.size),
+        "end_to_end_ms": round(total * 1000, 1),
+        "vectorize_ms": round(vectorize * 1000, 1),
+        "numpy_scoring_ms": round(vector_scoring * 1000, 2),
+        "python_loop_scoring_ms": round(loop_scoring * 1000, 1),
+        "max_abs_diff": float(max(abs(a - b) for a, b in zip(loop, scores))),
+        "top_scores": [round(float(scores[i]), 3) for i in top],
+    }))
+
+
+if __name__ == "__main__":
+    main()
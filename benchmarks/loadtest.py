@@ -0,0 +1,274 @@
+"""
+Load test for the three AI endpoints. Boots the app in this process (threaded WSGI
+server, temporary database and upload folder) against the stub Gemini server, then
+drives /resume/analyze, /cover-letter and /interview-prep from concurrent virtual users,
+each following its job until it finishes.
+
+The JSON report has p50/p95/p99 latency, throughput, errors and the per-phase timings
+recorded by utils.metrics for every scenario. Pass --baseline with an earlier report to
+print the latency change.
+
+    python -m benchmarks.loadtest --users 8 --requests 40 --latency 0.3 --overload-rate 0.05 \\
+        --output reports/loadtest.json --baseline reports/previous.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import requests
+
+from benchmarks.sample_pdf import make_pdf
+from benchmarks.stub_gemini import StubGeminiServer
+
+SCENARIOS = ("resume_analysis", "cover_letter", "interview_prep")
+PASSWORD = "loadtest-password"
+JOB_DESCRIPTION = ("We are hiring a backend engineer (req {n}) to build Python/Flask services on AWS "
+                   "with PostgreSQL, Docker and Kubernetes. You will own APIs end to end and mentor others.")
+
+
+class AppStub(StubGeminiServer):
+    """Plausible replies for each feature's prompt, so the app's parsing path runs for real."""
+
+    def reply_for(self, prompt):
+        if "Analyze the following resume" in prompt:
+            return json.dumps({"ats_score": 7, "key_skills": ["Python", "Flask", "AWS"],
+                               "strengths": ["Backend depth"], "missing_sections": ["Summary"],
+                               "improvements": [{"issue": "Passive bullets", "suggestion": "Lead with verbs"}]})
+        if "cover letter" in prompt:
+            return "Dear Hiring Manager,\n\n" + "I am excited to apply for this role. " * 40 + "\n\nSincerely"
+        return json.dumps({
+            "job_title": "Backend Engineer", "company": "ACME", "summary": "Backend role.",
+            "key_skills": [{"skill": "Python", "advice": "Know the GIL."}],
+            "behavioral_questions": [{"question": "A conflict you resolved?", "tip": "Use STAR."}],
+            "questions_to_ask": ["How is on-call organised?"], "final_tip": "Be concrete.",
+        })
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p):  # nearest-rank
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99), "max": ordered[-1],
+            "mean": round(sum(ordered) / len(ordered), 1)}
+
+
+class VirtualUser:
+    def __init__(self, base_url, index, poll_interval, job_timeout):
+        self.base_url = base_url
+        self.email = f"user{index}@loadtest.dev"
+        self.session = requests.Session()
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+
+    def sign_in(self):
+        data = {"email": self.email, "password": PASSWORD, "confirm_password": PASSWORD}
+        self.session.post(self.base_url + "/register", data=data, allow_redirects=False)
+        response = self.session.post(self.base_url + "/login", data=data, allow_redirects=False)
+        if response.status_code != 302:
+            raise RuntimeError(f"login failed for {self.email}: HTTP {response.status_code}")
+
+    def request(self, scenario, n, pages):
+        if scenario == "resume_analysis":
+            pdf = make_pdf(pages, seed=n)
+            return self.session.post(self.base_url + "/resume/analyze",
+                                     files={"resume": (f"resume_{n}.pdf", pdf, "application/pdf")})
+        job_description = JOB_DESCRIPTION.format(n=n)
+        if scenario == "cover_letter":
+            return self.session.post(self.base_url + "/cover-letter", data={
+                "job_title": "Backend Engineer", "job_description": job_description, "company_info": "ACME"})
+        return self.session.post(self.base_url + "/interview-prep", data={
+            "job_title": "Backend Engineer", "job_description": job_description,
+            "options": json.dumps(["technical", "behavioral"])})
+
+    def run(self, scenario, n, pages):
+        """Submits one request and follows its job; returns (accept_ms, end_to_end_ms, error or None)."""
+        started = time.perf_counter()
+        response = self.request(scenario, n, pages)
+        accept_ms = (time.perf_counter() - started) * 1000
+        if response.status_code not in (200, 202):
+            return accept_ms, None, f"HTTP {response.status_code}"
+        if response.status_code == 202:
+            status_url = self.base_url + response.json()["status_url"]
+            deadline = time.perf_counter() + self.job_timeout
+            while True:
+                job = self.session.get(status_url).json()
+                if job["status"] in ("done", "failed") or time.perf_counter() > deadline:
+                    break
+                time.sleep(self.poll_interval)
+            if job["status"] != "done":
+                return accept_ms, None, job.get("error") or f"job still {job['status']}"
+        return accept_ms, (time.perf_counter() - started) * 1000, None
+
+
+def run_scenario(scenario, users, total, pages, first_n):
+    """Sends `total` requests spread over the users (one thread each)."""
+    from utils.metrics import phase_seconds, gemini_requests
+
+    phases_before, gemini_before = phase_seconds.snapshot(), gemini_requests.snapshot()
+    results = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker(user):
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            result = user.run(scenario, first_n + i, pages[i % len(pages)])
+            with lock:
+                results.append(result)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    phases = {}
+    for key, (seconds, count) in phase_seconds.snapshot().items():
+        before_seconds, before_count = phases_before.get(key, (0.0, 0))
+        if count > before_count:
+            phases[key[0]] = {"count": count - before_count,
+                              "mean_ms": round((seconds - before_seconds) / (count - before_count) * 1000, 2),
+                              "total_s": round(seconds - before_seconds, 3)}
+    gemini = Counter()
+    for (model, outcome), count in gemini_requests.snapshot().items():
+        gemini[outcome] += count - gemini_before.get((model, outcome), 0)
+
+    ok = [end_to_end for _, end_to_end, error in results if error is None]
+    errors = Counter(error[:120] for _, _, error in results if error is not None)
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "failed": sum(errors.values()),
+        "errors": dict(errors.most_common(10)),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "accept_ms": percentiles([round(accept, 1) for accept, _, _ in results]),
+        "end_to_end_ms": percentiles([round(value, 1) for value in ok]),
+        "phases": dict(sorted(phases.items())),
+        "gemini_requests": {outcome: count for outcome, count in sorted(gemini.items()) if count},
+    }
+
+
+def compare(report, baseline):
+    """Percentage change of end-to-end latency percentiles against an earlier report."""
+    changes = {}
+    for scenario, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario, {}).get("end_to_end_ms", {})
+        current = result["end_to_end_ms"]
+        changes[scenario] = {p: f"{(current[p] - previous[p]) / previous[p] * 100:+.1f}%"
+                             for p in ("p50", "p95", "p99") if previous.get(p) and p in current}
+    return changes
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def boot(args, workdir):
+    """Starts the stub and the app (imported only now, so it picks up the environment below)."""
+    stub = AppStub(latency=args.latency, error_rate=args.error_rate, overload_rate=args.overload_rate,
+                   seed=args.seed).start()
+    os.environ.update({
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "loadtest"),
+        "GEMINI_API_BASE": stub.base_url,
+        "GEMINI_CACHE_ENABLED": "1" if args.cache else "0",
+        "GEMINI_CACHE_PATH": os.path.join(workdir, "gemini_cache.db"),
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(workdir, "loadtest.db"),
+        "UPLOAD_ROOT": os.path.join(workdir, "uploads"),
+        "PAGE_CACHE_URL": os.path.join(workdir, "page_cache.db"),
+        "JOB_BACKEND": "thread",
+        "JOB_WORKERS": str(args.workers),
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+    from werkzeug.serving import make_server
+    from app import app
+
+    app.config["WTF_CSRF_ENABLED"] = False  # the virtual users post forms without scraping tokens
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no access log line per request
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return stub, server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5], help="PDF page counts to cycle")
+    parser.add_argument("--workers", type=int, default=4, help="background job workers (JOB_WORKERS)")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub Gemini latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Gemini calls answered 500")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="fraction of Gemini calls answered 503")
+    parser.add_argument("--cache", action="store_true", help="keep the Gemini response cache enabled")
+    parser.add_argument("--job-timeout", type=float, default=120)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier report to compare latencies against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="smartcareer-loadtest-")
+    stub, server, base_url = boot(args, workdir)
+    try:
+        users = [VirtualUser(base_url, i, args.poll_interval, args.job_timeout) for i in range(args.users)]
+        # Setup without injected faults: every user gets an account and a current resume
+        error_rate, overload_rate = stub.error_rate, stub.overload_rate
+        stub.error_rate = stub.overload_rate = 0.0
+        for user in users:
+            user.sign_in()
+        run_scenario("resume_analysis", users, len(users), [1], first_n=10 ** 6)
+        stub.error_rate, stub.overload_rate = error_rate, overload_rate
+        stub.counts.update(ok=0, **{"500": 0, "503": 0})
+
+        report = {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            "scenarios": {},
+        }
+        for index, scenario in enumerate(args.scenarios):
+            report["scenarios"][scenario] = run_scenario(scenario, users, args.requests, args.pages,
+                                                         first_n=index * args.requests)
+        report["stub_responses"] = dict(stub.counts)
+    finally:
+        server.shutdown()
+        stub.stop()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["baseline_change"] = compare(report, json.load(f))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Generates text-only resume PDFs of a given page count (no PDF library needed).
+
+    python -m benchmarks.sample_pdf --pages 1 2 5 --out /tmp/resumes
+"""
+import argparse
+import os
+import random
+
+SKILLS = ["Python", "Flask", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS", "React",
+          "TypeScript", "Kafka", "Terraform", "Git", "Linux", "SQL", "Celery", "GraphQL", "Agile"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Automated", "Reduced", "Scaled", "Mentored", "Shipped"]
+OBJECTS = ["a billing service", "the CI/CD pipeline", "customer-facing APIs", "the data warehouse",
+           "an on-call rotation", "search indexing", "the mobile backend", "reporting dashboards"]
+LINES_PER_PAGE = 48
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def resume_lines(pages, seed=0):
+    rng = random.Random(seed)
+    lines = [f"Candidate {seed} - Software Engineer", f"candidate{seed}@example.com", "",
+             "SUMMARY", "Engineer with experience across backend services and infrastructure.", "",
+             "SKILLS", ", ".join(rng.sample(SKILLS, 8)), "", "EXPERIENCE"]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}, "
+                     f"improving throughput by {rng.randint(10, 90)}%.")
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def make_pdf(pages=1, seed=0):
+    """Returns the bytes of a `pages`-page PDF with resume-like text (different per seed)."""
+    lines = resume_lines(pages, seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        chunk = lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]
+        stream = "BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(f"({_escape(line)}) '" for line in chunk) + " ET"
+        stream = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5])
+    parser.add_argument("--count", type=int, default=1, help="files per page count")
+    parser.add_argument("--out", default="sample_pdfs")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for pages in args.pages:
+        for seed in range(args.count):
+            path = os.path.join(args.out, f"resume_{pages}p_{seed}.pdf")
+            with open(path, "wb") as f:
+                f.write(make_pdf(pages, seed))
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
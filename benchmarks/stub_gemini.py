@@ -0,0 +1,129 @@
+"""
+Local stand-in for the Gemini REST API.
+
+Run standalone:
+    python -m benchmarks.stub_gemini --port 8765 --latency 0.05 --overload-rate 0.05
+then start the app with GEMINI_API_BASE=http://127.0.0.1:8765
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        fault = self.server.pick_fault()
+        if fault:
+            self.send_error_reply(fault)
+            return
+        try:
+            prompt = json.loads(body)["contents"][0]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError):
+            prompt = ""
+        reply = self.server.reply_for(prompt)
+        if ":streamGenerateContent" in self.path:
+            self.stream_reply(reply)
+            return
+        payload = json.dumps({
+            "candidates": [{"content": {"parts": [{"text": reply}]}}]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_error_reply(self, status):
+        payload = json.dumps({"error": {"code": status, "message": "injected by stub"}}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def stream_reply(self, reply, chunk_chars=40):
+        # SSE framing as returned by ?alt=sse; connection closes at the end of the stream
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for i in range(0, len(reply), chunk_chars):
+            event = {"candidates": [{"content": {"parts": [{"text": reply[i:i + chunk_chars]}]}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            self.wfile.flush()
+            if self.server.chunk_latency:
+                time.sleep(self.server.chunk_latency)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, reply="{}", chunk_latency=0.0,
+                 error_rate=0.0, overload_rate=0.0, seed=None):
+        super().__init__((host, port), StubGeminiHandler)
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.reply = reply
+        # Fractions of requests answered with HTTP 500 / HTTP 503 instead of a reply
+        self.error_rate = error_rate
+        self.overload_rate = overload_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"ok": 0, "500": 0, "503": 0}
+
+    def pick_fault(self):
+        """Returns 500, 503 or None for the next request, and counts it."""
+        with self.lock:
+            roll = self.random.random()
+            if roll < self.error_rate:
+                fault = 500
+            elif roll < self.error_rate + self.overload_rate:
+                fault = 503
+            else:
+                fault = None
+            self.counts[str(fault) if fault else "ok"] += 1
+        return fault
+
+    def reply_for(self, prompt):
+        return self.reply
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Gemini stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with HTTP 500")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="fraction answered with HTTP 503")
+    args = parser.parse_args()
+    server = StubGeminiServer(port=args.port, latency=args.latency,
+                              error_rate=args.error_rate, overload_rate=args.overload_rate)
+    print(f"Stub Gemini listening on {server.base_url}")
+    server.serve_forever()
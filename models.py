@@ -1,11 +1,25 @@
 # models.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import password_hasher
 from datetime import datetime
+import json
 
 db = SQLAlchemy()
 
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Runs `PRAGMA name=value` on each new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @db.event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(150), unique=True, nullable=False)
@@ -13,10 +27,18 @@ class User(UserMixin, db.Model):
     resumes = db.relationship('Resume', backref='owner', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Verifies the password on the hashing pool. On success, a hash made with older
+        parameters (PASSWORD_HASH_METHOD changed) is replaced; the caller commits.
+        """
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.password_hash = password_hasher.hash(password)
+        return True
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -26,11 +48,18 @@ class Resume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)  # Extracted resume text
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded PDF
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    batch_run_id = db.Column(db.Integer, db.ForeignKey('batch_run.id'), index=True)  # set for bulk-ingested resumes
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     analysis_results = db.relationship('AnalysisResult', back_populates='resume', uselist=False)
 
+    @staticmethod
+    def current(user_id):
+        """Query for the user's own resume (excludes resumes ingested by batch runs)."""
+        return Resume.query.filter_by(user_id=user_id, batch_run_id=None)
+
     def __repr__(self):
         return f"<Resume {self.filename} for User {self.user_id}>"
 
@@ -38,17 +67,56 @@ class Resume(db.Model):
 class AnalysisResult(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     ats_score = db.Column(db.Integer)
-    key_skills = db.Column(db.Text)  # JSON string
-    strengths = db.Column(db.Text)  # JSON string
-    missing_sections = db.Column(db.Text)  # JSON string
-    improvements = db.Column(db.Text)  # JSON string
-    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), nullable=False)
+    key_skills = db.Column(db.JSON)  # list of strings (also normalised into ResumeSkill)
+    strengths = db.Column(db.JSON)  # list of strings
+    missing_sections = db.Column(db.JSON)  # list of strings
+    improvements = db.Column(db.JSON)  # list of {"issue": ..., "suggestion": ...}
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), nullable=False, unique=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     resume = db.relationship('Resume', back_populates='analysis_results')
+    skills = db.relationship('ResumeSkill', backref='analysis', lazy=True, cascade='all, delete-orphan')
+
+    def set_skills(self, key_skills):
+        """Stores key_skills and rebuilds the indexed ResumeSkill rows."""
+        self.key_skills = list(key_skills or [])
+        seen = set()
+        rows = []
+        for skill in self.key_skills:
+            name = str(skill).strip()[:100]
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                rows.append(ResumeSkill(name=name, name_key=name.lower()))
+        self.skills = rows
+
+    @staticmethod
+    def users_with_skill(skill):
+        """Returns users whose resume analysis lists `skill` (case-insensitive)."""
+        return (User.query
+                .join(Resume, Resume.user_id == User.id)
+                .join(AnalysisResult, AnalysisResult.resume_id == Resume.id)
+                .join(ResumeSkill, ResumeSkill.analysis_id == AnalysisResult.id)
+                .filter(ResumeSkill.name_key == skill.strip().lower())
+                .distinct()
+                .all())
+
+    @staticmethod
+    def average_ats_score():
+        return db.session.query(db.func.avg(AnalysisResult.ats_score)).scalar()
 
     def __repr__(self):
         return f"<AnalysisResult for Resume {self.resume_id}>"
+
+
+class ResumeSkill(db.Model):
+    """One row per key skill of an AnalysisResult, so skills can be queried in SQL."""
+    id = db.Column(db.Integer, primary_key=True)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis_result.id'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    name_key = db.Column(db.String(100), nullable=False, index=True)  # lower-cased for lookups
+
+    def __repr__(self):
+        return f"<ResumeSkill {self.name}>"
     
 class CoverLetter(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -63,6 +131,11 @@ class CoverLetter(db.Model):
     user = db.relationship('User', backref='cover_letters')
     resume = db.relationship('Resume', backref='cover_letters')
 
+    __table_args__ = (
+        db.Index('ix_cover_letter_user_created', 'user_id', db.text('created_at DESC')),
+        db.Index('ix_cover_letter_resume', 'resume_id'),
+    )
+
     def __repr__(self):
         return f"<CoverLetter for {self.job_title} by User {self.user_id}>"
     
@@ -71,7 +144,7 @@ class InterviewPrep(db.Model):
     job_title = db.Column(db.String(200), nullable=False)
     job_description = db.Column(db.Text, nullable=False)
     options = db.Column(db.Text)  # JSON: ["questions_with_answers", "focus_areas"]
-    content = db.Column(db.Text, nullable=False)  # AI-generated content
+    content = db.Column(db.JSON, nullable=False)  # AI-generated prep (dict)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -79,5 +152,151 @@ class InterviewPrep(db.Model):
     user = db.relationship('User', backref='interview_preps')
     resume = db.relationship('Resume', backref='interview_preps')
 
+    __table_args__ = (
+        db.Index('ix_interview_prep_user_created', 'user_id', db.text('created_at DESC')),
+        db.Index('ix_interview_prep_resume', 'resume_id'),
+    )
+
     def __repr__(self):
-        return f"<InterviewPrep for {self.job_title} by User {self.user_id}>"
\ No newline at end of file
+        return f"<InterviewPrep for {self.job_title} by User {self.user_id}>"
+
+class LoginFailure(db.Model):
+    """A failed sign-in, counted per account by utils.passwords.AttemptLimiter across all processes."""
+    id = db.Column(db.Integer, primary_key=True)
+    account = db.Column(db.String(150), nullable=False)
+    failed_at = db.Column(db.Float, nullable=False, index=True)  # unix time
+
+    __table_args__ = (
+        db.Index('ix_login_failure_account_failed_at', 'account', 'failed_at'),
+    )
+
+
+class Job(db.Model):
+    """Background job (resume analysis, cover letter, interview prep) run by utils.job_queue."""
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued | running | done | failed
+    payload = db.Column(db.Text)  # JSON string
+    result = db.Column(db.Text)  # JSON string
+    error = db.Column(db.Text)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_job_status', 'status'),
+    )
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error
+        }
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.id} ({self.status})>"
+
+
+class BatchRun(db.Model):
+    """A bulk resume-analysis run (CLI `flask batch-analyze` or POST /api/batch)."""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    source = db.Column(db.String(500), nullable=False)  # directory or zip it was loaded from
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending | running | done | failed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    items = db.relationship('BatchItem', backref='run', lazy='dynamic', cascade='all, delete-orphan')
+
+    def progress(self):
+        counts = dict(
+            db.session.query(BatchItem.status, db.func.count(BatchItem.id))
+            .filter(BatchItem.run_id == self.id)
+            .group_by(BatchItem.status)
+            .all()
+        )
+        return {
+            "run_id": self.id,
+            "status": self.status,
+            "total": sum(counts.values()),
+            "done": counts.get('done', 0),
+            "failed": counts.get('failed', 0),
+            "pending": counts.get('pending', 0)
+        }
+
+    def __repr__(self):
+        return f"<BatchRun {self.id} ({self.status})>"
+
+
+class BatchItem(db.Model):
+    """One PDF in a BatchRun. Pending/failed items are retried when the run is resumed."""
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('batch_run.id'), nullable=False)
+    filename = db.Column(db.String(300), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    content_hash = db.Column(db.String(64))
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending | done | failed
+    error = db.Column(db.Text)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id'))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    resume = db.relationship('Resume')
+
+    __table_args__ = (
+        db.UniqueConstraint('run_id', 'filename', name='uq_batch_item_run_filename'),
+        db.Index('ix_batch_item_run_status', 'run_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f"<BatchItem {self.filename} ({self.status})>"
+
+
+def upgrade_schema():
+    """
+    Adds columns/indexes introduced after a database was first created.
+    db.create_all() only creates missing tables, so existing SQLite files need this.
+    """
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        resume_columns = {c['name'] for c in inspector.get_columns('resume')}
+        if 'content_hash' not in resume_columns:
+            conn.execute(db.text("ALTER TABLE resume ADD COLUMN content_hash VARCHAR(64)"))
+        if 'batch_run_id' not in resume_columns:
+            conn.execute(db.text("ALTER TABLE resume ADD COLUMN batch_run_id INTEGER REFERENCES batch_run (id)"))
+
+        # Keep only the newest analysis per resume before enforcing uniqueness
+        conn.execute(db.text(
+            "DELETE FROM analysis_result WHERE id NOT IN "
+            "(SELECT MAX(id) FROM analysis_result GROUP BY resume_id)"
+        ))
+        conn.execute(db.text(
+            "DELETE FROM resume_skill WHERE analysis_id NOT IN (SELECT id FROM analysis_result)"
+        ))
+
+        # Create any index declared on the models that an older database lacks
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+        # Text -> JSON columns. SQLite stores JSON as text, so the json.dumps() values already
+        # written are read back natively; other backends need the column type converted.
+        if db.engine.dialect.name == 'postgresql':
+            json_columns = {
+                'analysis_result': ['key_skills', 'strengths', 'missing_sections', 'improvements'],
+                'interview_prep': ['content'],
+            }
+            for table, columns in json_columns.items():
+                types = {c['name']: c['type'] for c in inspector.get_columns(table)}
+                for column in columns:
+                    if isinstance(types[column], db.Text):
+                        conn.execute(db.text(
+                            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json"
+                        ))
+
+    # Backfill the skill index for analyses saved before ResumeSkill existed
+    missing = AnalysisResult.query.filter(~AnalysisResult.skills.any()).all()
+    for analysis in missing:
+        if analysis.key_skills:
+            analysis.set_skills(analysis.key_skills)
+    db.session.commit()
@@ -0,0 +1,77 @@
+// app.js: helpers shared by templates extending base.html
+
+// Resolves with the job's result once /jobs/<id> reports "done"; rejects on "failed"
+// or when the job hasn't finished within timeoutMs.
+function waitForJob(statusUrl, intervalMs = 1000, timeoutMs = 5 * 60 * 1000) {
+  const deadline = Date.now() + timeoutMs;
+  return new Promise((resolve, reject) => {
+    const poll = () => {
+      if (Date.now() > deadline) {
+        reject(new Error('This is taking longer than expected. Please check back in a few minutes.'));
+        return;
+      }
+      fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+        .then(response => response.json())
+        .then(job => {
+          if (job.status === 'done') {
+            resolve(job.result);
+          } else if (job.status === 'failed') {
+            reject(new Error(job.error || 'Job failed'));
+          } else {
+            setTimeout(poll, intervalMs);
+          }
+        })
+        .catch(reject);
+    };
+    poll();
+  });
+}
+
+// Scores the resume against the job description locally as the user types (no AI call).
+function skillPrecheck(form, panel, url, delayMs = 500) {
+  let timer = null;
+  const run = () => {
+    const description = form.job_description.value.trim();
+    if (description.length < 40) {
+      panel.classList.add('hidden');
+      return;
+    }
+    const data = new FormData();
+    data.append('job_title', form.job_title.value.trim());
+    data.append('job_description', description);
+    fetch(url, {
+      method: 'POST',
+      body: data,
+      headers: { 'X-CSRFToken': document.querySelector('meta[name="csrf-token"]').content }
+    })
+      .then(response => response.ok ? response.json() : null)
+      .then(result => {
+        if (!result || !result.job_skills) {
+          panel.classList.add('hidden');
+          return;
+        }
+        panel.querySelector('[data-score]').textContent = result.score + '%';
+        panel.querySelector('[data-matched]').textContent = result.matched.join(', ') || 'None yet';
+        panel.querySelector('[data-missing]').textContent = result.missing.join(', ') || 'None';
+        panel.classList.remove('hidden');
+      })
+      .catch(() => panel.classList.add('hidden'));
+  };
+  const schedule = () => {
+    clearTimeout(timer);
+    timer = setTimeout(run, delayMs);
+  };
+  form.job_description.addEventListener('input', schedule);
+  form.job_title.addEventListener('input', schedule);
+}
+
+// Smooth scroll for in-page links
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+  anchor.addEventListener('click', function (e) {
+    e.preventDefault();
+    const target = document.querySelector(this.getAttribute('href'));
+    if (target) {
+      target.scrollIntoView({ behavior: 'smooth' });
+    }
+  });
+});
@@ -0,0 +1,206 @@
+# tasks.py
+# Background job handlers. Each receives (user_id, payload) and returns a JSON-able dict
+# that the front end receives from /jobs/<job_id> once the job is done.
+import json
+import logging
+from functools import partial
+from models import db, Resume, AnalysisResult, CoverLetter, InterviewPrep
+from utils.job_queue import job_queue
+from utils.json_extract import extract_json
+from utils.metrics import timed
+
+logger = logging.getLogger("smartcareer.tasks")
+
+ANALYSIS_SCHEMA = {
+    "ats_score": int,
+    "key_skills": [str],
+    "strengths": [str],
+    "missing_sections": [str],
+    "improvements": [{"issue": str, "suggestion": str}],
+}
+
+INTERVIEW_PREP_SCHEMA = {
+    "job_title": str,
+    "company": str,
+    "summary": str,
+    "key_skills": [{"skill": str, "advice": str}],
+    "behavioral_questions": [{"question": str, "tip": str}],
+    "questions_to_ask": [str],
+    "final_tip": str,
+}
+
+# Fields each interview-prep section prompt (gemini_client.INTERVIEW_PREP_SECTIONS) is asked for
+INTERVIEW_PREP_FIELDS = {
+    "overview": ("job_title", "company", "summary", "final_tip"),
+    "key_skills": ("key_skills",),
+    "behavioral_questions": ("behavioral_questions",),
+    "questions_to_ask": ("questions_to_ask",),
+}
+
+
+# Passed to the Gemini calls as `validate`, so replies that can't be parsed are never cached
+validate_analysis = partial(extract_json, schema=ANALYSIS_SCHEMA)
+validate_interview_prep = partial(extract_json, schema=INTERVIEW_PREP_SCHEMA)
+
+
+def parse_analysis_json(ai_raw):
+    """Parses analyze_resume() output, tolerating fences, text around the JSON and truncation."""
+    with timed("json_parse", feature="analysis"):
+        return extract_json(ai_raw, ANALYSIS_SCHEMA)
+
+
+@job_queue.task('resume_analysis')
+def run_resume_analysis(user_id, payload):
+    from utils.pdf_parser import extract_text_from_pdf
+    from utils.gemini_client import analyze_resume
+
+    content_hash = payload.get('content_hash')
+
+    # Identical bytes seen before (any user): reuse extracted text and analysis
+    source = None
+    if content_hash:
+        source = (Resume.query
+                  .options(db.joinedload(Resume.analysis_results))
+                  .filter_by(content_hash=content_hash)
+                  .order_by(Resume.updated_at.desc())
+                  .first())
+    source_analysis = source.analysis_results if source else None
+
+    raw_text = source.content if source else extract_text_from_pdf(payload['file_path'])
+
+    if source_analysis:
+        ai_data = None
+    else:
+        ai_data = parse_analysis_json(analyze_resume(raw_text, validate=validate_analysis))
+
+    # Save to DB
+    resume = Resume.current(user_id).first()
+    if resume:
+        resume.filename = payload['filename']
+        resume.content = raw_text
+        resume.content_hash = content_hash
+    else:
+        resume = Resume(filename=payload['filename'], content=raw_text,
+                        content_hash=content_hash, user_id=user_id)
+        db.session.add(resume)
+    db.session.flush()
+
+    analysis = AnalysisResult.query.filter_by(resume_id=resume.id).first()
+    if not analysis:
+        analysis = AnalysisResult(resume_id=resume.id)
+        db.session.add(analysis)
+
+    if source_analysis:
+        if source_analysis is not analysis:
+            analysis.ats_score = source_analysis.ats_score
+            analysis.set_skills(source_analysis.key_skills)
+            analysis.strengths = source_analysis.strengths
+            analysis.missing_sections = source_analysis.missing_sections
+            analysis.improvements = source_analysis.improvements
+    else:
+        analysis.ats_score = ai_data.get("ats_score")
+        analysis.set_skills(ai_data.get("key_skills", []))
+        analysis.strengths = ai_data.get("strengths", [])
+        analysis.missing_sections = ai_data.get("missing_sections", [])
+        analysis.improvements = ai_data.get("improvements", [])
+
+    with timed("db_commit"):
+        db.session.commit()
+    return {"success": True}
+
+
+@job_queue.task('cover_letter')
+def run_cover_letter(user_id, payload):
+    from utils.gemini_client import generate_cover_letter
+
+    resume = db.session.get(Resume, payload['resume_id'])
+    letter = generate_cover_letter(resume.content, payload['job_description'], payload['company_info'])
+
+    new_letter = CoverLetter(
+        job_title=payload['job_title'],
+        job_description=payload['job_description'],
+        company_info=payload['company_info'],
+        content=letter,
+        user_id=user_id,
+        resume_id=resume.id
+    )
+    db.session.add(new_letter)
+    with timed("db_commit"):
+        db.session.commit()
+
+    return {"success": True, "letter": letter}
+
+
+@job_queue.task('interview_prep')
+def run_interview_prep(user_id, payload):
+    from utils.gemini_client import generate_interview_prep
+
+    job_title = payload['job_title']
+    job_description = payload['job_description']
+    options_json = payload['options']
+    try:
+        options = json.loads(options_json)
+    except json.JSONDecodeError:
+        options = []
+
+    resume = db.session.get(Resume, payload['resume_id'])
+    # One reply per section (generated concurrently), merged into a single object
+    raw_sections = generate_interview_prep(
+        resume_text=resume.content,
+        job_title=job_title,
+        job_description=job_description,
+        options=options,
+        validate=validate_interview_prep
+    )
+
+    data = {}
+    for section, raw_ai_output in raw_sections.items():
+        logger.debug("Raw interview prep output (%s):\n%s", section, raw_ai_output)
+        try:
+            with timed("json_parse", feature="interview_prep"):
+                parsed = extract_json(raw_ai_output, INTERVIEW_PREP_SCHEMA)
+        except ValueError as e:
+            # The section falls back to its default below; the others are still usable
+            logger.warning("Interview prep section %s could not be parsed: %s", section, e)
+            continue
+        fields = INTERVIEW_PREP_FIELDS.get(section, INTERVIEW_PREP_SCHEMA)
+        data.update((key, value) for key, value in parsed.items() if key in fields)
+    if not data:
+        raise ValueError("No valid JSON in AI response")
+
+    # ✅ Make fields optional with defaults
+    final_data = {
+        "job_title": data.get("job_title", job_title),
+        "company": data.get("company", "the company"),
+        "summary": data.get("summary", "Preparation guide generated by AI."),
+        "sections": data.get("sections", []),  # ✅ Now optional
+        "key_skills": data.get("key_skills", []),
+        "behavioral_questions": data.get("behavioral_questions", []),
+        "questions_to_ask": data.get("questions_to_ask", []),
+        "final_tip": data.get("final_tip", "Practice your answers out loud and tailor them to your own experiences.")
+    }
+
+    # ✅ Save to DB
+    new_prep = InterviewPrep(
+        job_title=final_data["job_title"],
+        job_description=job_description,
+        options=options_json,
+        content=final_data,
+        user_id=user_id,
+        resume_id=resume.id
+    )
+    db.session.add(new_prep)
+    with timed("db_commit"):
+        db.session.commit()
+
+    return {
+        "success": True,
+        "content": json.dumps(final_data, ensure_ascii=False)
+    }
+
+
+@job_queue.task('batch_analysis')
+def run_batch_analysis(user_id, payload):
+    from utils.batch import run_batch
+
+    return run_batch(payload['run_id'], concurrency=payload.get('concurrency', 4))
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP = tempfile.mkdtemp()
+# utils.gemini_client refuses to import without a key; tests never reach the real API
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("GEMINI_CACHE_PATH", os.path.join(TMP, "gemini_cache.db"))
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///" + os.path.join(TMP, "test.db"))
+os.environ.setdefault("JOB_BACKEND", "inline")
+os.environ.setdefault("PAGE_CACHE_BACKEND", "none")
+os.environ.setdefault("ASSETS_AUTO_BUILD", "0")
+os.environ.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import app
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    return app
+
+
+@pytest.fixture(scope="session")
+def user(app):
+    """A signed-up user with an analysed resume, 5 cover letters and 5 interview preps."""
+    from models import db, User, Resume, AnalysisResult, CoverLetter, InterviewPrep
+
+    with app.app_context():
+        user = User(email="history@example.com")
+        user.set_password("secret1")
+        db.session.add(user)
+        db.session.flush()
+        resume = Resume(filename="cv.pdf", content="Python developer", user_id=user.id)
+        analysis = AnalysisResult(resume=resume, ats_score=7, strengths=["Python"], missing_sections=[],
+                                  improvements=[{"issue": "i", "suggestion": "s"}])
+        analysis.set_skills(["Python", "Flask", "SQL"])
+        db.session.add_all([resume, analysis])
+        db.session.flush()
+        for i in range(5):
+            db.session.add(CoverLetter(job_title=f"Dev {i}", job_description="Python", company_info="",
+                                       content="Dear team", user_id=user.id, resume_id=resume.id))
+            db.session.add(InterviewPrep(job_title=f"Dev {i}", job_description="Python", options="[]",
+                                         content={"summary": "s"}, user_id=user.id, resume_id=resume.id))
+        db.session.commit()
+        return user.email
+
+
+@pytest.fixture
+def client(app, user):
+    client = app.test_client()
+    response = client.post("/login", data={"email": user, "password": "secret1"})
+    assert response.status_code == 302
+    return client
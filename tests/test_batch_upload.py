@@ -0,0 +1,42 @@
+import io
+import os
+import re
+import zipfile
+
+import pytest
+
+
+def csrf_token(client):
+    page = client.get("/resume/analyze").get_data(as_text=True)
+    return re.search(r'name="csrf-token" content="([^"]+)"', page).group(1)
+
+
+def archive(size):
+    """A zip of about `size` bytes (stored, incompressible padding; no PDFs, so nothing is analysed)."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("padding.bin", os.urandom(size))
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def csrf_enabled(app):
+    app.config["WTF_CSRF_ENABLED"] = True
+    yield
+    app.config["WTF_CSRF_ENABLED"] = False
+
+
+def test_batch_over_resume_limit_passes_csrf(app, client, csrf_enabled):
+    assert app.config["MAX_CONTENT_LENGTH"] < 6 * 1024 * 1024
+    response = client.post("/api/batch", data={"archive": (archive(6 * 1024 * 1024), "big.zip")},
+                           headers={"X-CSRFToken": csrf_token(client)}, content_type="multipart/form-data")
+    assert response.status_code == 202, response.get_data(as_text=True)
+
+
+def test_batch_over_batch_limit_names_it(app, client, csrf_enabled, monkeypatch):
+    monkeypatch.setitem(app.config, "BATCH_MAX_BYTES", 7 * 1024 * 1024)
+    response = client.post("/api/batch", data={"archive": (archive(8 * 1024 * 1024), "big.zip")},
+                           headers={"X-CSRFToken": csrf_token(client)}, content_type="multipart/form-data")
+    assert response.status_code == 413
+    assert "batch limit" in response.get_json()["error"]
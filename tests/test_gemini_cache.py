@@ -0,0 +1,54 @@
+import pytest
+
+from utils import gemini_client
+from utils.response_cache import ResponseCache
+from tasks import validate_analysis
+
+GOOD = '{"ats_score": 7, "key_skills": ["Python"], "strengths": [], "missing_sections": [], "improvements": []}'
+BAD = 'Sorry, I cannot help with that.'
+
+
+@pytest.fixture
+def gemini(monkeypatch, tmp_path):
+    """call_gemini with a fresh cache and a scripted _post_gemini; yields the list of replies to send."""
+    replies = []
+    sent = []
+
+    def post(prompt, model, max_retries):
+        sent.append(prompt)
+        return replies.pop(0)
+
+    monkeypatch.setattr(gemini_client, "response_cache", ResponseCache(path=str(tmp_path / "cache.db")))
+    monkeypatch.setattr(gemini_client, "_post_gemini", post)
+    return replies, sent
+
+
+def test_invalid_reply_is_not_cached(gemini):
+    replies, sent = gemini
+    replies.extend([BAD, GOOD])
+
+    assert gemini_client.call_gemini("prompt", validate=validate_analysis) == BAD
+    assert gemini_client.call_gemini("prompt", validate=validate_analysis) == GOOD
+    assert gemini_client.call_gemini("prompt", validate=validate_analysis) == GOOD
+    assert len(sent) == 2  # the bad reply was fetched again, the good one came from the cache
+
+
+def test_cached_reply_that_fails_validation_is_dropped(gemini):
+    replies, sent = gemini
+    key = gemini_client.make_cache_key("gemini-1.5-flash", gemini_client.GENERATION_CONFIG, "prompt")
+    gemini_client.response_cache.set(key, BAD)  # e.g. cached before validation existed
+    replies.append(GOOD)
+
+    assert gemini_client.call_gemini("prompt", validate=validate_analysis) == GOOD
+    assert gemini_client.response_cache.get(key) == GOOD
+    assert len(sent) == 1
+
+
+def test_streamed_empty_letter_is_not_cached(gemini, monkeypatch):
+    streams = [[" ", "\n"], ["Dear ", "team"]]
+    monkeypatch.setattr(gemini_client, "_stream_post", lambda prompt, model: iter(streams.pop(0)))
+
+    assert "".join(gemini_client.stream_gemini("letter", validate=gemini_client.validate_letter)).strip() == ""
+    assert "".join(gemini_client.stream_gemini("letter", validate=gemini_client.validate_letter)) == "Dear team"
+    assert "".join(gemini_client.stream_gemini("letter", validate=gemini_client.validate_letter)) == "Dear team"
+    assert streams == []
@@ -0,0 +1,57 @@
+import threading
+
+from models import db, User, Resume
+from utils.identity import identity_cache
+
+
+def test_resume_written_by_job_thread_refreshes_identity(app):
+    from app import load_identity
+
+    with app.app_context():
+        user = User(email="identity@example.com")
+        user.set_password("secret1")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        assert identity_cache.get(user_id, load_identity).resume_id is None
+
+    def job():  # a resume-analysis job saving the first resume
+        with app.app_context():
+            db.session.add(Resume(filename="cv.pdf", content="text", user_id=user_id))
+            db.session.commit()
+            db.session.remove()
+
+    worker = threading.Thread(target=job)
+    worker.start()
+    worker.join()
+
+    with app.app_context():
+        assert identity_cache.get(user_id, load_identity).resume_id is not None
+
+
+def test_resume_written_by_another_process_refreshes_identity(app, tmp_path):
+    from app import cached_identity
+    from utils.page_cache import page_cache, PageCache, SQLiteBackend
+
+    path = str(tmp_path / "pages.db")
+    other = PageCache()  # the page cache of another worker process
+    backend, page_cache.backend = page_cache.backend, SQLiteBackend(path)
+    other.backend = SQLiteBackend(path)
+    try:
+        with app.app_context():
+            user = User(email="other-process@example.com")
+            user.set_password("secret1")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+            assert cached_identity(user_id).resume_id is None
+            assert cached_identity(user_id).resume_id is None  # served from the cache
+
+            # The other process commits the first resume; none of this process's hooks run
+            with db.engine.begin() as conn:
+                conn.execute(db.insert(Resume).values(filename="cv.pdf", content="text", user_id=user_id))
+            other.invalidate_user(user_id)
+
+            assert cached_identity(user_id).resume_id is not None
+    finally:
+        page_cache.backend = backend
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, User, Job
+from utils.job_queue import JobQueue
+
+
+def worker(app, calls):
+    """A job queue as one server process would have it, with a handler that records its runs."""
+    queue = JobQueue()
+    queue.app, queue.lease = app, 300
+    queue.executor = ThreadPoolExecutor(max_workers=2)
+    queue.task("probe")(lambda user_id, payload: calls.append(payload["n"]) or {})
+    return queue
+
+
+def test_each_worker_resumes_on_start_but_jobs_run_once(app, user):
+    calls = []
+    with app.app_context():
+        owner = User.query.filter_by(email=user).first()
+        stale = datetime.utcnow() - timedelta(hours=1)
+        db.session.add_all([
+            Job(id="queued", kind="probe", status="queued", user_id=owner.id, payload='{"n": 1}'),
+            Job(id="orphaned", kind="probe", status="running", user_id=owner.id, payload='{"n": 2}',
+                updated_at=stale),
+            Job(id="live", kind="probe", status="running", user_id=owner.id, payload='{"n": 3}'),
+        ])
+        db.session.commit()
+
+    workers = [worker(app, calls) for _ in range(3)]
+    for queue in workers:
+        with app.test_request_context():
+            queue._resume_once()
+            queue._resume_once()  # only the first request of a process resumes
+    for queue in workers:
+        queue.executor.shutdown(wait=True)
+
+    assert sorted(calls) == [1, 2]
+    with app.app_context():
+        statuses = {job.id: job.status for job in Job.query.filter(Job.id.in_(["queued", "orphaned", "live"]))}
+    assert statuses == {"queued": "done", "orphaned": "done", "live": "running"}
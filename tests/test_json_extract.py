@@ -0,0 +1,22 @@
+import pytest
+
+from utils.json_extract import extract_json
+
+SCHEMA = {"ats_score": int, "ratio": float, "key_skills": [str]}
+
+
+@pytest.mark.parametrize("score", ['"nan"', '"inf"', '"-Infinity"', '"1e999"', "NaN", "Infinity", "1e999"])
+def test_non_finite_numbers_are_dropped(score):
+    data = extract_json(f'{{"ats_score": {score}, "ratio": {score}, "key_skills": ["Python"]}}', SCHEMA)
+    assert data == {"key_skills": ["Python"]}
+
+
+@pytest.mark.parametrize("score, expected", [('"7"', 7), ("7.6", 8), ('" 6.2 "', 6)])
+def test_numeric_values_are_coerced(score, expected):
+    assert extract_json(f'{{"ats_score": {score}}}', SCHEMA) == {"ats_score": expected}
+
+
+def test_truncated_reply_is_repaired():
+    data = extract_json('```json\n{"ats_score": 8, "key_skills": ["Python", "Fla', SCHEMA)
+    assert data["ats_score"] == 8
+    assert data["key_skills"][0] == "Python"
@@ -0,0 +1,35 @@
+import pytest
+
+from models import db, LoginFailure
+from utils.passwords import AttemptLimiter, TooManyAttempts
+
+
+def shared_limiter(app):
+    limiter = AttemptLimiter(max_attempts=5, window=300)
+    limiter.init_app(app, db, LoginFailure)
+    return limiter
+
+
+def test_failures_are_shared_between_processes(app):
+    with app.app_context():
+        first, second = shared_limiter(app), shared_limiter(app)  # e.g. two gunicorn workers
+        for _ in range(3):
+            first.failure("shared@example.com")
+        for _ in range(2):
+            second.failure("shared@example.com")
+        with pytest.raises(TooManyAttempts):
+            first.check("shared@example.com")
+        with pytest.raises(TooManyAttempts):
+            shared_limiter(app).check("shared@example.com")  # a restarted worker
+
+        second.reset("shared@example.com")
+        first.check("shared@example.com")
+
+
+def test_login_is_refused_after_max_failures(app, client):
+    for _ in range(5):
+        response = client.post("/login", data={"email": "victim@example.com", "password": "wrong1"})
+        assert response.status_code == 200
+    response = client.post("/login", data={"email": "victim@example.com", "password": "wrong1"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from models import db, User, Resume, CoverLetter
+from utils.page_cache import page_cache, MemoryBackend, PageCache, SQLiteBackend
+
+
+@pytest.fixture
+def cached_pages():
+    backend, page_cache.backend = page_cache.backend, MemoryBackend()
+    yield page_cache
+    page_cache.backend = backend
+
+
+def test_write_from_job_thread_invalidates_pages(app, client, user, cached_pages):
+    first = client.get("/cover-letters")
+    etag = first.headers["ETag"]
+    assert client.get("/cover-letters", headers={"If-None-Match": etag}).status_code == 304
+
+    def job():  # what a job-queue worker thread does
+        with app.app_context():
+            owner = User.query.filter_by(email=user).first()
+            resume = Resume.current(owner.id).first()
+            db.session.add(CoverLetter(job_title="Written by a job", job_description="", company_info="",
+                                       content="x", user_id=owner.id, resume_id=resume.id))
+            db.session.commit()
+            db.session.remove()
+
+    worker = threading.Thread(target=job)
+    worker.start()
+    worker.join()
+
+    response = client.get("/cover-letters", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"Written by a job" in response.data
+
+
+def test_sqlite_backend_shares_invalidations_between_processes(tmp_path):
+    path = str(tmp_path / "pages.db")
+    web, worker = PageCache(), PageCache()  # one per process
+    web.backend, worker.backend = SQLiteBackend(path), SQLiteBackend(path)
+
+    before = web.version(1)
+    worker.invalidate_user(1)
+    assert web.version(1) > before
@@ -0,0 +1,24 @@
+from utils.prompt_budget import compact, drop_boilerplate
+
+JOB = "Senior Python engineer for Flask APIs on AWS with PostgreSQL and Docker."
+
+
+def test_page_markers_are_dropped_but_dates_kept():
+    text = "Acme Corp\n2019\n06/2021\nPage 1 of 2\nBuilt APIs\n2 of 2\nPage 3"
+    assert drop_boilerplate(text).split("\n") == ["Acme Corp", "2019", "06/2021", "Built APIs"]
+
+
+def test_all_caps_name_line_stays_in_the_prompt():
+    resume = "\n".join([
+        "JANE DOE",
+        "jane@example.com | +1 555 0100",
+        "",
+        "EXPERIENCE",
+        "Python and Flask APIs on AWS with PostgreSQL. " * 40,
+        "",
+        "HOBBIES",
+        "Gardening, chess and long-distance running. " * 40,
+    ])
+    prompt = compact(resume, 300, query=JOB)
+    assert prompt.startswith("JANE DOE\njane@example.com")
+    assert "Python and Flask" in prompt
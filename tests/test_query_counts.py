@@ -0,0 +1,32 @@
+import pytest
+
+from models import db
+from utils.identity import identity_cache
+from utils.query_counter import assert_max_queries
+
+# Each page needs the signed-in user's identity (one query, skipped when cached) plus one
+# query for its own data; more than that means an N+1 crept in.
+PAGES = [
+    "/dashboard",
+    "/analysis/view",
+    "/cover-letters",
+    "/interview-preps",
+    "/api/cover-letters",
+    "/api/interview-preps",
+]
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_page_query_count(app, client, path):
+    identity_cache.clear()
+    with app.app_context(), assert_max_queries(db.engine, 2):
+        response = client.get(path)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", PAGES)
+def test_page_query_count_with_cached_identity(app, client, path):
+    client.get(path)
+    with app.app_context(), assert_max_queries(db.engine, 1):
+        response = client.get(path)
+    assert response.status_code == 200
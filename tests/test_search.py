@@ -0,0 +1,27 @@
+from sqlalchemy import text
+
+from models import db, User, Resume, CoverLetter
+from utils.search import search_index
+
+
+def test_updates_and_deletes_touch_one_row_by_rowid(app, user):
+    with app.app_context():
+        owner = User.query.filter_by(email=user).first()
+        resume = Resume.current(owner.id).first()
+        letter = CoverLetter(job_title="Lighthouse keeper", job_description="", company_info="",
+                             content="Fresnel lenses", user_id=owner.id, resume_id=resume.id)
+        db.session.add(letter)
+        db.session.commit()
+        assert [hit["id"] for hit in search_index.search(owner.id, "fresnel")] == [letter.id]
+
+        letter.content = "Foghorn drills"
+        db.session.commit()
+        assert search_index.search(owner.id, "fresnel") == []
+        assert [hit["id"] for hit in search_index.search(owner.id, "foghorn")] == [letter.id]
+
+        plan = db.session.execute(text("EXPLAIN QUERY PLAN DELETE FROM document_fts WHERE rowid = 1")).all()
+        assert ":=" in plan[0][-1]  # FTS5 looks the rowid up instead of filtering every row
+
+        db.session.delete(letter)
+        db.session.commit()
+        assert search_index.search(owner.id, "foghorn") == []
@@ -0,0 +1,11 @@
+from utils.skill_match import SEED_SKILLS, SkillVocabulary, match_job
+
+
+def test_generic_words_are_not_read_as_skills():
+    vocabulary = SkillVocabulary(SEED_SKILLS + ["R"])
+    job = ("Join our sales team. Plan B and plan C are covered, with job security and testing "
+           "of new markets. You will write Python and C++.")
+    result = match_job("Python and C++ developer", job, vocabulary)
+    assert sorted(result["matched"]) == ["C++", "Python"]
+    assert result["missing"] == []
+    assert result["job_skills"] == 2
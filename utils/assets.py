@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import tempfile
+
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built/served
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".svg", ".json", ".txt", ".html", ".map", ".xml"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def fingerprint(path, length=12):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:length]
+
+
+def hashed_name(relative_path, digest):
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build(static_folder, output_dir):
+    """
+    Copies every file under `static_folder` (except `output_dir`) to `output_dir` with a
+    content hash in its name, writes .gz (and .br, if brotli is installed) next to text
+    assets when that makes them smaller, and writes manifest.json. Returns the manifest.
+    """
+    output_dir = os.path.abspath(output_dir)
+    assets, encodings = {}, {}
+    for dirpath, dirnames, filenames in os.walk(static_folder):
+        dirnames[:] = sorted(d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != output_dir)
+        for filename in sorted(filenames):
+            source = os.path.join(dirpath, filename)
+            relative = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            target = hashed_name(relative, fingerprint(source))
+            target_path = os.path.join(output_dir, target)
+            assets[relative] = target
+            if os.path.exists(target_path):
+                found = [e for e, suffix in (("br", ".br"), ("gzip", ".gz")) if os.path.exists(target_path + suffix)]
+                if found:
+                    encodings[target] = found
+                continue  # same content already built
+
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            shutil.copyfile(source, target_path)
+            if os.path.splitext(filename)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            with open(source, "rb") as f:
+                data = f.read()
+            variants = [("gzip", ".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.insert(0, ("br", ".br", brotli.compress(data, quality=11)))
+            for encoding, suffix, compressed in variants:
+                if len(compressed) < len(data):
+                    _write_atomic(target_path + suffix, compressed)
+                    encodings.setdefault(target, []).append(encoding)
+
+    manifest = {"assets": assets, "encodings": encodings}
+    _write_atomic(os.path.join(output_dir, "manifest.json"), json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+class Assets:
+    """
+    Fingerprinted static files. `asset_url('css/base.css')` in templates points at the
+    hashed copy under static/dist (served with a one-year immutable Cache-Control, and
+    precompressed when the browser accepts br/gzip). Falls back to the plain static URL
+    in debug mode or for files missing from the manifest.
+    """
+
+    def __init__(self):
+        self.assets = {}
+        self.encodings = {}
+
+    def init_app(self, app):
+        self.output_dir = os.path.join(app.static_folder, app.config.get("ASSETS_DIR", "dist"))
+        self.prefix = os.path.basename(self.output_dir)
+        missing = not os.path.exists(os.path.join(self.output_dir, "manifest.json"))
+        if missing and app.config.get("ASSETS_AUTO_BUILD", True):
+            self.build(app)
+        else:
+            self.load()
+        app.add_url_rule(f"{app.static_url_path}/{self.prefix}/<path:filename>", "asset", self.send_asset)
+        app.jinja_env.globals["asset_url"] = self.url
+        app.extensions["assets"] = self
+
+    def build(self, app):
+        manifest = build(app.static_folder, self.output_dir)
+        self.assets, self.encodings = manifest["assets"], manifest["encodings"]
+        return manifest
+
+    def load(self):
+        path = os.path.join(self.output_dir, "manifest.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            self.assets, self.encodings = manifest["assets"], manifest["encodings"]
+
+    def url(self, filename):
+        hashed = self.assets.get(filename)
+        if hashed is None or current_app.debug:
+            return url_for("static", filename=filename)
+        return url_for("asset", filename=hashed)
+
+    def send_asset(self, filename):
+        available = self.encodings.get(filename, ())
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in available and request.accept_encodings[encoding]:
+                response = send_from_directory(self.output_dir, filename + suffix, mimetype=mimetype,
+                                                max_age=IMMUTABLE_MAX_AGE)
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = send_from_directory(self.output_dir, filename, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+            response.headers.pop("Content-Encoding", None)
+        if available:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
@@ -0,0 +1,175 @@
+import os
+import time
+import zipfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from models import db, Resume, AnalysisResult, BatchRun, BatchItem
+from utils.file_store import store_stream, UploadRejected
+from utils.metrics import timed
+
+BATCH_COMMIT_SIZE = int(os.getenv("BATCH_COMMIT_SIZE", 25))
+
+
+def _iter_sources(source):
+    """Yields (name, open_stream_callable, size) for every PDF in a directory or zip file."""
+    if os.path.isdir(source):
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith('.pdf'):
+                    path = os.path.join(dirpath, filename)
+                    yield os.path.relpath(path, source), (lambda p=path: open(p, 'rb')), os.path.getsize(path)
+    elif zipfile.is_zipfile(source):
+        archive = zipfile.ZipFile(source)
+        with archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith('.pdf'):
+                    yield info.filename, (lambda i=info: archive.open(i)), info.file_size
+    else:
+        raise ValueError(f"Batch source must be a directory or a zip file: {source}")
+
+
+def create_run(user_id, source, max_bytes=None, max_pages=None):
+    """
+    Registers every PDF under `source` (directory or .zip) as a pending BatchItem.
+    Files are copied into content-addressed storage, so a zip can be discarded afterwards.
+    Files that fail validation are recorded as failed items.
+    """
+    run = BatchRun(user_id=user_id, source=source, status='pending')
+    db.session.add(run)
+    db.session.flush()
+
+    for name, opener, size in _iter_sources(source):
+        item = BatchItem(run_id=run.id, filename=name[:300], file_path='')
+        try:
+            if max_bytes and size > max_bytes:
+                raise UploadRejected(f"File exceeds the {max_bytes // (1024 * 1024)}MB limit.", 413)
+            with opener() as stream:
+                item.content_hash, item.file_path = store_stream(stream, max_bytes=max_bytes, max_pages=max_pages)
+        except UploadRejected as e:
+            item.status, item.error = 'failed', str(e)
+        db.session.add(item)
+
+    db.session.commit()
+    return run
+
+
+def _analyze(item_id, file_path):
+    """Runs in a worker thread: PDF extraction + Gemini call, no database access."""
+    from utils.pdf_parser import extract_text_from_pdf
+    from utils.gemini_client import analyze_resume
+    from tasks import parse_analysis_json, validate_analysis
+
+    raw_text = extract_text_from_pdf(file_path)
+    return item_id, raw_text, parse_analysis_json(analyze_resume(raw_text, validate=validate_analysis))
+
+
+def _save(run, item, raw_text, ai_data):
+    resume = Resume(filename=os.path.basename(item.filename), content=raw_text,
+                    content_hash=item.content_hash, user_id=run.user_id, batch_run_id=run.id)
+    analysis = AnalysisResult(resume=resume, ats_score=ai_data.get("ats_score"))
+    analysis.set_skills(ai_data.get("key_skills", []))
+    analysis.strengths = ai_data.get("strengths", [])
+    analysis.missing_sections = ai_data.get("missing_sections", [])
+    analysis.improvements = ai_data.get("improvements", [])
+    db.session.add(resume)
+    item.status, item.error, item.resume = 'done', None, resume
+
+
+def run_batch(run_id, concurrency=4, commit_size=BATCH_COMMIT_SIZE, on_progress=None):
+    """
+    Analyses the pending (and previously failed) items of a run with at most
+    `concurrency` extractions/Gemini calls in flight, committing results every
+    `commit_size` files. Safe to call again on an interrupted run: finished items are skipped.
+
+    on_progress(item, progress_dict) is called after each file.
+    Returns a summary including throughput in files/min.
+    """
+    run = db.session.get(BatchRun, run_id)
+    if run is None:
+        raise ValueError(f"Batch run {run_id} not found")
+    run.status = 'running'
+    db.session.commit()
+
+    try:
+        return _process(run, max(1, concurrency), commit_size, on_progress)
+    except BaseException:
+        # Keep the items committed so far; the run can be resumed, and watchers see it ended
+        db.session.rollback()
+        run = db.session.get(BatchRun, run_id)
+        run.status = 'failed'
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+        raise
+
+
+def _process(run, concurrency, commit_size, on_progress):
+    items = run.items.filter(BatchItem.status.in_(['pending', 'failed']), BatchItem.file_path != '').all()
+    items_by_id = {item.id: item for item in items}
+
+    # Files already analysed anywhere (same bytes) are copied instead of re-sent to Gemini
+    hashes = {item.content_hash for item in items if item.content_hash}
+    known = {}
+    if hashes:
+        for resume in (Resume.query.options(db.joinedload(Resume.analysis_results))
+                       .filter(Resume.content_hash.in_(hashes)).all()):
+            if resume.analysis_results:
+                known[resume.content_hash] = resume
+
+    # Counted in memory: querying per file would autoflush and hold the write lock between commits
+    progress = run.progress()
+    progress['failed'] -= len([item for item in items if item.status == 'failed'])
+    progress['pending'] = len(items)
+    started = time.monotonic()
+    processed = uncommitted = 0
+
+    def finish(item):
+        nonlocal processed, uncommitted
+        processed += 1
+        uncommitted += 1
+        progress['pending'] -= 1
+        progress[item.status] += 1
+        if uncommitted >= commit_size:
+            with timed("db_commit", rows=uncommitted):
+                db.session.commit()
+            uncommitted = 0
+        if on_progress:
+            on_progress(item, dict(progress))
+
+    to_analyze = []
+    for item in items:
+        source = known.get(item.content_hash)
+        if source:
+            a = source.analysis_results
+            _save(run, item, source.content, {
+                "ats_score": a.ats_score, "key_skills": a.key_skills, "strengths": a.strengths,
+                "missing_sections": a.missing_sections, "improvements": a.improvements
+            })
+            finish(item)
+        else:
+            to_analyze.append(item)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        futures = {pool.submit(_analyze, item.id, item.file_path): item.id for item in to_analyze}
+        for future in as_completed(futures):
+            item = items_by_id[futures[future]]
+            try:
+                _, raw_text, ai_data = future.result()
+                _save(run, item, raw_text, ai_data)
+            except Exception as e:
+                item.status, item.error = 'failed', str(e)[:1000]
+            finish(item)
+
+    run.status = 'done'
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+
+    elapsed = time.monotonic() - started
+    summary = run.progress()
+    summary.update({
+        "processed": processed,
+        "elapsed_seconds": round(elapsed, 2),
+        "files_per_min": round(processed / elapsed * 60, 1) if elapsed > 0 else 0.0
+    })
+    return summary
@@ -0,0 +1,63 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"text/html", "text/plain", "text/css", "text/javascript", "application/javascript",
+                          "application/json", "image/svg+xml"}
+
+
+class ResponseCompressor:
+    """
+    Compresses HTML/JSON/text responses (br when the client accepts it and brotli is
+    installed, else gzip). Streamed, passthrough (files) and already-encoded responses
+    are left alone. Strong ETags become weak ones, since the bytes now differ per encoding.
+    """
+
+    def init_app(self, app):
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", 500)
+        self.gzip_level = app.config.get("COMPRESS_GZIP_LEVEL", 6)
+        self.brotli_quality = app.config.get("COMPRESS_BROTLI_QUALITY", 5)
+        if app.config.get("COMPRESS_RESPONSES", True):
+            app.after_request(self.compress)
+        app.extensions["response_compressor"] = self
+
+    def choose_encoding(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def compress(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.choose_encoding()
+        if encoding is None or request.method == "HEAD":
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+response_compressor = ResponseCompressor()
@@ -0,0 +1,82 @@
+import os
+import hashlib
+import tempfile
+
+UPLOAD_ROOT = os.getenv("UPLOAD_ROOT", "uploads")
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+
+
+def blob_path(content_hash, root=UPLOAD_ROOT):
+    """Content-addressed location: uploads/blobs/ab/abcdef....pdf"""
+    return os.path.join(root, "blobs", content_hash[:2], f"{content_hash}.pdf")
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload fails validation; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def store_upload(file_storage, root=UPLOAD_ROOT, max_bytes=None, max_pages=None):
+    """Stores a Werkzeug FileStorage upload; see store_stream()."""
+    return store_stream(file_storage.stream, root, max_bytes, max_pages)
+
+
+def store_stream(stream, root=UPLOAD_ROOT, max_bytes=None, max_pages=None):
+    """
+    Streams a PDF to a temp file while hashing it (SHA-256), then moves it
+    into content-addressed storage. Identical bytes are stored once, whoever uploads them.
+
+    Validation happens before anything reaches storage or the parser:
+    - the first bytes must be the PDF magic "%PDF-"
+    - the body may not exceed `max_bytes` (checked while streaming)
+    - the document may not have more than `max_pages` pages
+    Raises UploadRejected on failure. Returns (content_hash, path).
+    """
+    tmp_dir = os.path.join(root, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise UploadRejected("File is not a valid PDF.")
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadRejected(f"File exceeds the {max_bytes // (1024 * 1024)}MB limit.", 413)
+                digest.update(chunk)
+                out.write(chunk)
+
+        if size == 0:
+            raise UploadRejected("Uploaded file is empty.")
+
+        if max_pages:
+            from utils.pdf_parser import count_pages
+            try:
+                pages = count_pages(tmp_path)
+            except Exception:
+                raise UploadRejected("PDF could not be read.")
+            if pages > max_pages:
+                raise UploadRejected(f"PDF has {pages} pages; the limit is {max_pages}.")
+
+        content_hash = digest.hexdigest()
+        path = blob_path(content_hash, root)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return content_hash, path
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
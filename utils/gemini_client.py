@@ -2,65 +2,291 @@ import requests
 import os
 import time
 import random
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from utils.response_cache import ResponseCache, make_cache_key
+from utils.http_client import post_json
+from utils.rate_limiter import governor, estimate_tokens
+from utils.single_flight import SingleFlight, process_lock
+from utils import prompt_budget
+from utils.metrics import timed, gemini_requests, gemini_retries, gemini_tokens, gemini_latency
+
+logger = logging.getLogger("smartcareer.gemini")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise RuntimeError("GEMINI_API_KEY not found in environment variables.")
 
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1/models/{model}:generateContent"
+# Override GEMINI_API_BASE to point at a local stub server for testing/benchmarks
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com")
+GEMINI_API_URL = GEMINI_API_BASE.rstrip("/") + "/v1/models/{model}:generateContent"
+GEMINI_STREAM_URL = GEMINI_API_BASE.rstrip("/") + "/v1/models/{model}:streamGenerateContent"
 
+GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "topK": 32,
+    "topP": 0.9,
+    "maxOutputTokens": 1024
+}
 
-def call_gemini(prompt, model="gemini-1.5-flash", max_retries=3):
+# Shared response cache (memory LRU + SQLite). Set GEMINI_CACHE_ENABLED=0 to bypass.
+CACHE_ENABLED = os.getenv("GEMINI_CACHE_ENABLED", "1") != "0"
+response_cache = ResponseCache() if CACHE_ENABLED else None
+
+# Concurrent identical prompts share one request (threads in this process; with
+# GEMINI_PROCESS_LOCKS=1 also other processes on the host, via lock files + the cache)
+SINGLE_FLIGHT_ENABLED = os.getenv("GEMINI_SINGLE_FLIGHT", "1") != "0"
+PROCESS_LOCKS_ENABLED = os.getenv("GEMINI_PROCESS_LOCKS", "0") == "1"
+single_flight = SingleFlight()
+
+
+def call_gemini(prompt, model="gemini-1.5-flash", max_retries=3, use_cache=True, validate=None):
     """
     Calls Gemini API with retry logic on 503 errors.
+    Identical (model, generationConfig, prompt) requests are served from the response cache,
+    and concurrent identical requests share a single upstream call.
+    `validate(text)` raises ValueError for a reply the caller can't use; such replies are
+    returned but not cached, so a retry asks Gemini again instead of replaying them.
     """
+    cache_key = make_cache_key(model, GENERATION_CONFIG, prompt)
+    caching = use_cache and response_cache is not None
+    if caching:
+        cached = _cached_reply(cache_key, validate)
+        if cached is not None:
+            return cached
+
+    if not SINGLE_FLIGHT_ENABLED:
+        return _fetch(cache_key, prompt, model, max_retries, caching, validate)
+    return single_flight.do(cache_key, lambda: _fetch(cache_key, prompt, model, max_retries, caching, validate))
+
+
+def _is_valid(text, validate):
+    if validate is None:
+        return True
+    try:
+        validate(text)
+    except ValueError as e:
+        logger.warning("Gemini reply failed validation, not caching it: %s", e)
+        return False
+    return True
+
+
+def _cached_reply(cache_key, validate):
+    """The cached reply for `cache_key`, dropping it if it no longer passes `validate`."""
+    cached = response_cache.get(cache_key)
+    if cached is not None and not _is_valid(cached, validate):
+        response_cache.delete(cache_key)
+        return None
+    return cached
+
+
+def _fetch(cache_key, prompt, model, max_retries, caching, validate=None):
+    if caching and PROCESS_LOCKS_ENABLED:
+        # Another process may be sending the same prompt: wait for it, then use its cached reply
+        with process_lock(cache_key):
+            cached = _cached_reply(cache_key, validate)
+            if cached is not None:
+                return cached
+            text = _post_gemini(prompt, model, max_retries)
+            if _is_valid(text, validate):
+                response_cache.set(cache_key, text)
+            return text
+
+    text = _post_gemini(prompt, model, max_retries)
+    if caching and _is_valid(text, validate):
+        response_cache.set(cache_key, text)
+    return text
+
+
+def get_stats():
+    """Limiter/breaker state plus response-cache counters, for monitoring."""
+    stats = {"limiter": governor.get_stats(), "single_flight": single_flight.get_stats()}
+    if response_cache is not None:
+        stats["cache"] = response_cache.get_stats()
+    return stats
+
+
+def _post_gemini(prompt, model, max_retries):
     url = GEMINI_API_URL.format(model=model)
     headers = {"Content-Type": "application/json"}
     params = {"key": GEMINI_API_KEY}
     data = {
         "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {
-            "temperature": 0.4,
-            "topK": 32,
-            "topP": 0.9,
-            "maxOutputTokens": 1024
-        }
+        "generationConfig": GENERATION_CONFIG
     }
 
+    estimated = estimate_tokens(prompt, GENERATION_CONFIG["maxOutputTokens"])
+
     for attempt in range(max_retries + 1):
         try:
-            response = requests.post(url, headers=headers, params=params, json=data)
-
-            if response.status_code == 200:
-                result = response.json()
-                return result['candidates'][0]['content']['parts'][0]['text']
-
-            elif response.status_code == 503:
-                if attempt < max_retries:
-                    # Exponential backoff with jitter
-                    wait = (2 ** attempt) + random.uniform(0, 1)
-                    print(f"503 Overloaded. Retrying in {wait:.2f}s... (Attempt {attempt + 1})")
-                    time.sleep(wait)
-                    continue
+            # Waits for RPM/TPM quota and a free in-flight slot; fails fast while the breaker is open
+            with governor.slot(estimated):
+                started = time.perf_counter()
+                response = post_json(url, data, params=params, headers=headers)
+                gemini_latency.observe(time.perf_counter() - started, model=model)
+                gemini_requests.inc(model=model, outcome=response.status_code)
+                if response.status_code >= 500:
+                    governor.record_failure()
                 else:
-                    raise RuntimeError("Gemini API is overloaded. Please try again later.")
-
-            else:
-                raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
-
+                    governor.record_success()  # reachable; quota (429) is the limiter's concern
         except requests.exceptions.RequestException as e:
+            governor.record_failure()
+            gemini_requests.inc(model=model, outcome="network_error")
             if attempt == max_retries:
                 raise RuntimeError(f"API request failed: {str(e)}")
+            gemini_retries.inc(reason="network_error")
+            logger.warning("Gemini request failed (%s); retrying in %ss (attempt %d)", e, 2 ** attempt, attempt + 1)
             time.sleep(2 ** attempt)  # Retry on network issues
+            continue
+
+        if response.status_code == 200:
+            result = response.json()
+            _count_tokens(model, result.get("usageMetadata"), estimated)
+            return result['candidates'][0]['content']['parts'][0]['text']
+
+        elif response.status_code == 429:
+            # Quota exceeded: pause the shared limiter so every caller waits out Retry-After
+            governor.record_rate_limited(_retry_after(response, default=2 ** attempt))
+            if attempt < max_retries:
+                gemini_retries.inc(reason="429")
+                logger.warning("Gemini rate limit (429); retrying (attempt %d)", attempt + 1)
+                continue
+            raise RuntimeError("Gemini API rate limit reached. Please try again later.")
+
+        elif response.status_code == 503:
+            if attempt < max_retries:
+                # Exponential backoff with jitter
+                wait = (2 ** attempt) + random.uniform(0, 1)
+                gemini_retries.inc(reason="503")
+                logger.warning("Gemini overloaded (503); retrying in %.2fs (attempt %d)", wait, attempt + 1)
+                time.sleep(wait)
+                continue
+            else:
+                raise RuntimeError("Gemini API is overloaded. Please try again later.")
+
+        else:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
 
     raise RuntimeError("Max retries exceeded.")
 
 
+def _count_tokens(model, usage, estimated):
+    """Token counters from usageMetadata, falling back to the request estimate."""
+    if usage:
+        gemini_tokens.inc(usage.get("promptTokenCount", 0), model=model, kind="prompt")
+        gemini_tokens.inc(usage.get("candidatesTokenCount", 0), model=model, kind="output")
+    else:
+        gemini_tokens.inc(estimated - GENERATION_CONFIG["maxOutputTokens"], model=model, kind="prompt_estimated")
+
+
+def _retry_after(response, default):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", default)))
+    except ValueError:  # HTTP-date form
+        return float(default)
+
+
+def stream_gemini(prompt, model="gemini-1.5-flash", use_cache=True, validate=None):
+    """
+    Yields text chunks from Gemini's streamGenerateContent endpoint (server-sent events).
+    The joined text is stored in the response cache (if it passes `validate`, as in
+    call_gemini), so a repeat prompt replays instantly.
+    A caller arriving while the same prompt is already streaming waits and gets the full text at once.
+    """
+    cache_key = make_cache_key(model, GENERATION_CONFIG, prompt)
+    caching = use_cache and response_cache is not None
+    if caching:
+        cached = _cached_reply(cache_key, validate)
+        if cached is not None:
+            yield cached
+            return
+
+    call, leader = single_flight.claim(cache_key) if SINGLE_FLIGHT_ENABLED else (None, True)
+    if not leader:
+        yield call.result()
+        return
+
+    chunks = []
+    try:
+        for text in _stream_post(prompt, model):
+            chunks.append(text)
+            yield text
+        text = "".join(chunks)
+        if caching and chunks and _is_valid(text, validate):
+            response_cache.set(cache_key, text)
+        if call is not None:
+            call.resolve(text)
+    except Exception as e:
+        if call is not None:
+            call.fail(e)
+        raise
+    finally:
+        if call is not None:
+            single_flight.release(cache_key, call)  # also covers a client that disconnected mid-stream
+
+
+def _stream_post(prompt, model):
+    url = GEMINI_STREAM_URL.format(model=model)
+    headers = {"Content-Type": "application/json"}
+    params = {"key": GEMINI_API_KEY, "alt": "sse"}
+    data = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": GENERATION_CONFIG
+    }
+
+    estimated = estimate_tokens(prompt, GENERATION_CONFIG["maxOutputTokens"])
+    # The in-flight slot is held for the whole stream
+    with governor.slot(estimated):
+        started = time.perf_counter()
+        try:
+            response = post_json(url, data, params=params, headers=headers, stream=True)
+        except requests.exceptions.RequestException as e:
+            governor.record_failure()
+            gemini_requests.inc(model=model, outcome="network_error")
+            raise RuntimeError(f"API request failed: {str(e)}")
+        gemini_requests.inc(model=model, outcome=response.status_code)
+
+        with response:
+            if response.status_code >= 500:
+                governor.record_failure()
+            else:
+                governor.record_success()
+            if response.status_code == 429:
+                governor.record_rate_limited(_retry_after(response, default=1))
+                raise RuntimeError("Gemini API rate limit reached. Please try again later.")
+            if response.status_code == 503:
+                raise RuntimeError("Gemini API is overloaded. Please try again later.")
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+
+            usage = None
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                event = json.loads(line[len("data:"):])
+                usage = event.get("usageMetadata", usage)
+                for candidate in event.get("candidates", []):
+                    for part in candidate.get("content", {}).get("parts", []):
+                        text = part.get("text")
+                        if text:
+                            yield text
+            gemini_latency.observe(time.perf_counter() - started, model=model)
+            _count_tokens(model, usage, estimated)
+
+
 # -------------------------------
 # AI-Powered Career Functions
 # -------------------------------
 
-def analyze_resume(resume_text):
+def validate_letter(text):
+    if not text.strip():
+        raise ValueError("empty cover letter")
+
+
+def analyze_resume(resume_text, validate=None):
+    with timed("prompt_build", feature="analysis"):
+        resume_text = prompt_budget.compact(resume_text, prompt_budget.ANALYSIS_RESUME_TOKENS)
     prompt = f"""
     Analyze the following resume and return a JSON object with:
     - "ats_score": number (1-10)
@@ -83,31 +309,48 @@ def analyze_resume(resume_text):
     }}
 
     Resume:
-    {resume_text[:10000]}
+    {resume_text}
     """
-    return call_gemini(prompt)
+    return call_gemini(prompt, validate=validate)
 
 
 def generate_cover_letter(resume_text, job_description, company_info="Not provided"):
     """
     Generates a personalized cover letter using resume, job description, and optional company info.
     """
-    prompt = f"""
+    return call_gemini(build_cover_letter_prompt(resume_text, job_description, company_info),
+                       validate=validate_letter)
+
+
+def stream_cover_letter(resume_text, job_description, company_info="Not provided"):
+    """
+    Same as generate_cover_letter, but yields the letter in chunks as Gemini produces it.
+    """
+    return stream_gemini(build_cover_letter_prompt(resume_text, job_description, company_info),
+                         validate=validate_letter)
+
+
+def build_cover_letter_prompt(resume_text, job_description, company_info="Not provided"):
+    # Resume sections most relevant to the job are kept when the resume exceeds its token budget
+    with timed("prompt_build", feature="cover_letter"):
+        resume_text = prompt_budget.compact(resume_text, prompt_budget.COVER_LETTER_RESUME_TOKENS,
+                                            query=job_description)
+        job_description = prompt_budget.compact(job_description, prompt_budget.COVER_LETTER_JOB_TOKENS)
+    return f"""
     Write a professional and compelling cover letter for a candidate applying to a role.
     Match the tone to the company and role. Highlight relevant experience and enthusiasm.
 
     Resume Summary:
-    {resume_text[:8000]}
+    {resume_text}
 
     Job Description:
-    {job_description[:5000]}
+    {job_description}
 
     About the Company:
     {company_info}
 
     Make the letter concise, 3-4 paragraphs, and end with a call to action.
     """
-    return call_gemini(prompt)
 
 
 # def  generate_interview_prep(resume_text, job_title, job_description, options):
@@ -155,16 +398,34 @@ def generate_cover_letter(resume_text, job_description, company_info="Not provid
 #     """
 #     return call_gemini(prompt)
 
-def generate_interview_prep(resume_text, job_title, job_description, options):
-    prompt = f"""
-    Analyze the resume and job description below.
-    Return a JSON object with:
+# Each interview-prep section is generated by its own prompt, so no single reply has to
+# fit every section into maxOutputTokens
+INTERVIEW_PREP_SECTIONS = {
+    "overview": """
     - job_title
     - company
     - summary (1 sentence)
-    - key_skills: [{{"skill": "...", "advice": "..."}}] (max 5 skills)
-    - behavioral_questions: [{{"question": "...", "tip": "..."}}] (max 5)
-    - questions_to_ask: [string] (max 5)
+    - final_tip (1 sentence)""",
+    "key_skills": """
+    - key_skills: [{"skill": "...", "advice": "..."}] (max 5 skills)""",
+    "behavioral_questions": """
+    - behavioral_questions: [{"question": "...", "tip": "..."}] (max 5)""",
+    "questions_to_ask": """
+    - questions_to_ask: [string] (max 5)""",
+}
+
+
+def build_interview_prep_prompts(resume_text, job_title, job_description, options):
+    """{section: prompt} for INTERVIEW_PREP_SECTIONS, sharing one compacted resume/job context."""
+    with timed("prompt_build", feature="interview_prep"):
+        resume_text = prompt_budget.compact(resume_text, prompt_budget.INTERVIEW_RESUME_TOKENS,
+                                            query=f"{job_title}\n{job_description}")
+        job_description = prompt_budget.compact(job_description, prompt_budget.INTERVIEW_JOB_TOKENS)
+    prompts = {}
+    for section, fields in INTERVIEW_PREP_SECTIONS.items():
+        prompts[section] = f"""
+    Analyze the resume and job description below to help the candidate prepare for an interview.
+    Return a JSON object with:{fields}
 
     Rules:
     - Return ONLY the JSON object.
@@ -174,9 +435,21 @@ def generate_interview_prep(resume_text, job_title, job_description, options):
     - No trailing commas.
     - Do not use markdown.
 
-    Resume: {resume_text[:6000]}  # Limit input size
+    Resume: {resume_text}
     Job Title: {job_title}
-    Job Description: {job_description[:3000]}
+    Job Description: {job_description}
     Selected Options: {', '.join(options)}
     """
-    return call_gemini(prompt)
\ No newline at end of file
+    return prompts
+
+
+def generate_interview_prep(resume_text, job_title, job_description, options, validate=None):
+    """
+    Sends one prompt per interview-prep section concurrently (one thread each; the response
+    cache, single-flight, rate limiter and retries still apply) and returns {section: raw reply}.
+    Wall-clock time is roughly that of the slowest section. `validate` applies to each reply.
+    """
+    prompts = build_interview_prep_prompts(resume_text, job_title, job_description, options)
+    with ThreadPoolExecutor(max_workers=len(prompts), thread_name_prefix="interview-prep") as pool:
+        replies = pool.map(lambda prompt: call_gemini(prompt, validate=validate), prompts.values())
+        return dict(zip(prompts, replies))
@@ -0,0 +1,58 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(os.getenv("GEMINI_HTTP_POOL_SIZE", 10))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", 60))
+HTTP_POOLING_ENABLED = os.getenv("GEMINI_HTTP_POOLING", "1") != "0"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_size=HTTP_POOL_SIZE):
+    """
+    Creates a requests.Session with a keep-alive connection pool of `pool_size` sockets per host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session():
+    """
+    Returns the process-wide pooled session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def reset_session():
+    """
+    Closes the shared session (e.g. after fork, or between benchmark runs).
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def post_json(url, payload, params=None, headers=None, timeout=None, pooled=HTTP_POOLING_ENABLED, stream=False):
+    """
+    POSTs a JSON body with connect/read timeouts.
+    pooled=False falls back to a one-off requests.post (useful for benchmarking).
+    stream=True leaves the body unread so it can be consumed with iter_lines().
+    """
+    timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    sender = get_session() if pooled else requests
+    return sender.post(url, params=params, headers=headers, json=payload, timeout=timeout, stream=stream)
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+
+class SessionUser(UserMixin):
+    """
+    current_user for authenticated requests: id, email and the id of the user's current
+    resume (None until one is uploaded). A plain object, so it can be shared between
+    requests without holding an ORM instance.
+    """
+
+    def __init__(self, id, email, resume_id=None):
+        self.id = id
+        self.email = email
+        self.resume_id = resume_id
+
+    def __repr__(self):
+        return f"<SessionUser {self.email}>"
+
+
+class IdentityCache:
+    """
+    Process-local cache of SessionUser by user id, so authenticated requests skip the user
+    and current-resume lookups. Each entry remembers the `version` it was loaded under
+    (app.py passes the user's shared page-cache version, bumped by every process's commit
+    hook) and is reloaded once that changes; invalidate() drops it at once in this process.
+    Without a version (page cache disabled) other processes' writes are seen after
+    IDENTITY_CACHE_TTL seconds.
+    """
+
+    def __init__(self, ttl=60, max_items=10000):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.entries = OrderedDict()  # user id -> (expires_at, version, SessionUser)
+        self.generation = 0  # bumped on invalidation, so a load racing with it isn't stored
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def init_app(self, app):
+        self.ttl = app.config.get("IDENTITY_CACHE_TTL", self.ttl)
+        self.max_items = app.config.get("IDENTITY_CACHE_MAX_ITEMS", self.max_items)
+        app.extensions["identity_cache"] = self
+
+    def get(self, user_id, loader, version=None):
+        """
+        The cached identity for `user_id` if it was loaded under `version`, else
+        loader(user_id) (stored unless None).
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                self.entries.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return entry[2]
+            self.stats["misses"] += 1
+            generation = self.generation
+
+        identity = loader(user_id)
+        if identity is not None and self.ttl > 0:
+            with self.lock:
+                if generation == self.generation:
+                    self.entries[user_id] = (now + self.ttl, version, identity)
+                    self.entries.move_to_end(user_id)
+                    while len(self.entries) > self.max_items:
+                        self.entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+            self.generation += 1
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, items=len(self.entries))
+
+
+identity_cache = IdentityCache()
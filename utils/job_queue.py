@@ -0,0 +1,182 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, Job
+
+logger = logging.getLogger("smartcareer.jobs")
+
+
+class JobQueue:
+    """
+    Runs slow work (PDF extraction, Gemini calls) off the request thread.
+
+    Job state lives in the `job` table so results survive restarts.
+    Backends (config JOB_BACKEND):
+    - "thread": bounded ThreadPoolExecutor of JOB_WORKERS threads (default)
+    - "inline": runs the job synchronously inside enqueue(); for tests and local debugging
+
+    A worker claims a job by flipping it from queued to running in one UPDATE, so a job
+    is only ever run by one process. While it runs, its updated_at is refreshed every
+    JOB_LEASE_SECONDS / 3; a running job whose updated_at is older than the lease belongs
+    to a dead process and is re-queued by resume_pending(). With the thread backend each
+    serving process calls it once, before its first request (JOB_RESUME_ON_START); the
+    claim makes that safe across workers. CLI commands don't serve requests, so they
+    don't resume jobs (use `flask resume-jobs` for that).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.handlers = {}
+        self.executor = None
+        self.active = set()  # ids of jobs running in this process
+        self.lock = threading.Lock()
+        self.heartbeat = None
+        self.resumed = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.backend = app.config.get("JOB_BACKEND", "thread")
+        self.lease = app.config.get("JOB_LEASE_SECONDS", 300)
+        if self.backend == "thread":
+            self.executor = ThreadPoolExecutor(
+                max_workers=app.config.get("JOB_WORKERS", 4),
+                thread_name_prefix="job-worker"
+            )
+        elif self.backend != "inline":
+            raise ValueError(f"Unknown JOB_BACKEND: {self.backend}")
+        if self.executor is not None and app.config.get("JOB_RESUME_ON_START", True):
+            app.before_request(self._resume_once)
+        app.extensions["job_queue"] = self
+
+    def _resume_once(self):
+        if self.resumed:
+            return
+        with self.lock:
+            if self.resumed:
+                return
+            self.resumed = True
+        try:
+            count = self.resume_pending()
+        except Exception:
+            logger.exception("Resuming pending jobs failed")
+        else:
+            if count:
+                logger.info("Resumed %d pending job(s)", count)
+
+    def task(self, kind):
+        """Registers `func(user_id, payload) -> dict` as the handler for `kind`."""
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+        return decorator
+
+    def enqueue(self, kind, user_id, payload):
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = Job(id=uuid.uuid4().hex, kind=kind, status="queued",
+                  user_id=user_id, payload=json.dumps(payload))
+        db.session.add(job)
+        db.session.commit()
+        self._submit(job.id)
+        return job
+
+    def resume_pending(self):
+        """
+        Re-submits queued jobs and running jobs whose lease has expired (their process died).
+        Safe to run from several processes at once: each job is still claimed by only one.
+        """
+        expired = datetime.utcnow() - timedelta(seconds=self.lease)
+        db.session.execute(
+            db.update(Job)
+            .where(Job.status == "running", Job.updated_at < expired)
+            .values(status="queued", updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        pending = [job_id for (job_id,) in db.session.execute(db.select(Job.id).where(Job.status == "queued"))]
+        for job_id in pending:
+            self._submit(job_id)
+        return len(pending)
+
+    def _submit(self, job_id):
+        if self.executor is not None:
+            self.executor.submit(self._run, job_id)
+        else:
+            self._run(job_id)
+
+    def _claim(self, job_id):
+        """Atomically moves `job_id` from queued to running; False if another worker got it."""
+        result = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _start_heartbeat(self):
+        with self.lock:
+            if self.heartbeat is None:
+                self.heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+                self.heartbeat.start()
+
+    def _beat(self):
+        interval = max(1, self.lease / 3)
+        while True:
+            time.sleep(interval)
+            with self.lock:
+                active = list(self.active)
+            if not active:
+                continue
+            with self.app.app_context():
+                try:
+                    db.session.execute(
+                        db.update(Job)
+                        .where(Job.id.in_(active), Job.status == "running")
+                        .values(updated_at=datetime.utcnow())
+                    )
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Job heartbeat failed")
+                finally:
+                    db.session.remove()
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+                with self.lock:
+                    self.active.add(job_id)
+                self._start_heartbeat()
+
+                job = db.session.get(Job, job_id)
+                handler = self.handlers[job.kind]
+                kind, user_id, payload = job.kind, job.user_id, json.loads(job.payload or "{}")
+                try:
+                    result = handler(user_id, payload)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.exception("Job %s (%s) failed", job_id, kind)
+                    job = db.session.get(Job, job_id)
+                    job.status = "failed"
+                    job.error = str(e)
+                else:
+                    job = db.session.get(Job, job_id)
+                    job.status = "done"
+                    job.result = json.dumps(result, ensure_ascii=False)
+                db.session.commit()
+            finally:
+                with self.lock:
+                    self.active.discard(job_id)
+                db.session.remove()
+
+
+job_queue = JobQueue()
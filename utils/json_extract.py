@@ -0,0 +1,233 @@
+import json
+import math
+import re
+
+FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*$", re.MULTILINE)
+PARTIAL_LITERAL = re.compile(r"([:\[,]\s*)(t|tr|tru|f|fa|fal|fals|n|nu|nul)$")
+PARTIAL_NUMBER = re.compile(r"(?<=\d)[-+.eE]+$")
+
+
+class JSONScanner:
+    """
+    Finds the first balanced top-level {...} in text that may arrive in chunks.
+    Braces inside strings are ignored, so one pass over the text is enough:
+
+        scanner = JSONScanner()
+        for chunk in stream:
+            if scanner.feed(chunk):
+                break
+        obj_text = scanner.result()
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.started = False
+        self.complete = False
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk):
+        """Consumes a chunk; returns True once the object is closed (later input is ignored)."""
+        if self.complete:
+            return True
+        for ch in chunk:
+            if not self.started:
+                if ch != "{":
+                    continue
+                self.started = True
+            self.buffer.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    return True
+        return False
+
+    def result(self):
+        """The object text (possibly truncated if the input ended early), or None if no '{' was seen."""
+        return "".join(self.buffer) if self.started else None
+
+
+def strip_fences(text):
+    """Removes markdown code fences (```json ... ```) around a response."""
+    return FENCE.sub("", text).strip()
+
+
+def _next_significant(text, index):
+    while index < len(text) and text[index] in " \t\r\n":
+        index += 1
+    return text[index] if index < len(text) else ""
+
+
+def repair(text):
+    """
+    Fixes the defects LLM output usually has: trailing commas, raw newlines and
+    unescaped quotes inside strings, and truncation (e.g. at maxOutputTokens) -
+    an unterminated string, a dangling key or partial literal, unclosed brackets.
+    """
+    out = []
+    stack = []
+    in_string = escape = is_key = awaiting_colon = False
+    last = ""  # last significant character outside strings
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+                out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch == '"':
+                # A quote only ends the string if JSON structure follows it
+                follower = _next_significant(text, i + 1)
+                if follower in ("", ",", ":", "}", "]"):
+                    in_string = False
+                    awaiting_colon = is_key
+                    last = ch
+                    out.append(ch)
+                else:
+                    out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\r":
+                out.append("\\r")
+            elif ch == "\t":
+                out.append("\\t")
+            else:
+                out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+            is_key = bool(stack) and stack[-1] == "{" and last in ("{", ",")
+        elif ch == ":":
+            awaiting_colon = False
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack:
+                stack.pop()
+        if ch not in " \t\r\n":
+            last = ch
+        out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+        awaiting_colon = is_key
+    repaired = "".join(out).rstrip()
+
+    if awaiting_colon:
+        repaired += ": null"
+    elif repaired.endswith(":"):
+        repaired += " null"
+    repaired = PARTIAL_LITERAL.sub(r"\1null", repaired)
+    repaired = PARTIAL_NUMBER.sub("", repaired)
+    repaired = repaired.rstrip().rstrip(",")
+
+    for opener in reversed(stack):
+        repaired += "}" if opener == "{" else "]"
+    return repaired
+
+
+def _drop_trailing_comma(out):
+    index = len(out) - 1
+    while index >= 0 and out[index] in (" ", "\t", "\r", "\n"):
+        index -= 1
+    if index >= 0 and out[index] == ",":
+        del out[index]
+
+
+def validate(data, schema):
+    """
+    Checks parsed output against a feature schema and returns a cleaned copy.
+
+    A schema maps keys to a type (or tuple of types), a one-element list [item_spec],
+    or a nested dict schema. Values of the wrong type are dropped so callers fall back
+    to their defaults; numeric strings are accepted for numbers and scalars for strings.
+    Raises ValueError if `data` is not an object or has none of the schema's keys.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("AI response JSON is not an object")
+    if schema and not any(key in data for key in schema):
+        raise ValueError("AI response JSON does not match the expected format")
+
+    cleaned = {}
+    for key, spec in schema.items():
+        if key in data:
+            ok, value = _coerce(data[key], spec)
+            if ok:
+                cleaned[key] = value
+    return cleaned
+
+
+def _coerce(value, spec):
+    if isinstance(spec, list):
+        if not isinstance(value, list):
+            return False, None
+        items = [_coerce(item, spec[0]) for item in value]
+        return True, [item for ok, item in items if ok]
+    if isinstance(spec, dict):
+        if not isinstance(value, dict):
+            return False, None
+        return True, {key: item for key, (ok, item) in
+                      ((key, _coerce(value[key], sub)) for key, sub in spec.items() if key in value) if ok}
+
+    types = spec if isinstance(spec, tuple) else (spec,)
+    if isinstance(value, bool) and bool not in types:
+        return False, None
+    if isinstance(value, float) and not math.isfinite(value):  # NaN/Infinity literals, 1e999
+        return False, None
+    if isinstance(value, types):
+        return True, value
+    if str in types and isinstance(value, (int, float)):
+        return True, str(value)
+    if (int in types or float in types) and isinstance(value, (str, int, float)):
+        try:
+            number = float(value.strip() if isinstance(value, str) else value)
+        except ValueError:
+            return False, None
+        if not math.isfinite(number):
+            return False, None
+        return True, (number if float in types else int(round(number)))
+    return False, None
+
+
+def extract_json(text, schema=None):
+    """
+    Returns the JSON object in an LLM response, repairing it if needed, and
+    validated against `schema` when one is given. Raises ValueError if no object
+    can be recovered.
+    """
+    text = strip_fences(text or "")
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        scanner = JSONScanner()
+        scanner.feed(text)
+        candidate = scanner.result()
+        if candidate is None:
+            raise ValueError("No valid JSON in AI response")
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            try:
+                data = json.loads(repair(candidate))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"AI response JSON could not be repaired: {e}")
+    return validate(data, schema) if schema else data
@@ -0,0 +1,42 @@
+import json
+import logging
+import sys
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a field
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level="INFO", fmt="text"):
+    """
+    Sets up the "smartcareer" logger tree once: LOG_LEVEL controls verbosity (DEBUG adds
+    per-phase timings and raw AI output), LOG_FORMAT is "text" or "json".
+    """
+    logger = logging.getLogger("smartcareer")
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        if fmt == "json":
+            handler.setFormatter(JSONFormatter())
+        else:
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    return logger
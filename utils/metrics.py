@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("smartcareer.timing")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name, self.documentation, self.labels = name, documentation, tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.documentation, self.labels = name, documentation, tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        """{label values: (sum, count)}, e.g. to diff before and after a benchmark run."""
+        with self.lock:
+            return {key: (series[-2], series[-1]) for key, series in self.series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels, key, {"le": _format_value(float(bound))})
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, {'le': '+Inf'})} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """Value read at scrape time from `callback() -> number or {label_tuple: number}`."""
+
+    def __init__(self, name, documentation, callback, labels=()):
+        self.name, self.documentation, self.labels = name, documentation, tuple(labels)
+        self.callback = callback
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.callback()
+        except Exception as e:  # a broken collector must not break the whole scrape
+            logger.warning("metrics collector %s failed: %s", self.name, e)
+            return []
+        if isinstance(value, dict):
+            for key, item in sorted(value.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(item)}")
+        elif value is not None:
+            lines.append(f"{self.name} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """Process-local metrics rendered in the Prometheus text exposition format (0.0.4)."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(self, name, documentation, callback, labels=()):
+        return self._register(Gauge(name, documentation, callback, labels))
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+phase_seconds = registry.histogram(
+    "smartcareer_phase_seconds", "Time spent in each pipeline phase.", labels=("phase",))
+http_request_seconds = registry.histogram(
+    "smartcareer_http_request_seconds", "Request latency by endpoint (until the response is returned).",
+    labels=("endpoint", "method", "status"))
+gemini_requests = registry.counter(
+    "smartcareer_gemini_requests_total", "Gemini HTTP requests by outcome.", labels=("model", "outcome"))
+gemini_retries = registry.counter(
+    "smartcareer_gemini_retries_total", "Gemini retries by reason.", labels=("reason",))
+gemini_tokens = registry.counter(
+    "smartcareer_gemini_tokens_total", "Gemini tokens (usageMetadata, or estimated).", labels=("model", "kind"))
+gemini_latency = registry.histogram(
+    "smartcareer_gemini_latency_seconds", "Latency of individual Gemini HTTP requests.", labels=("model",))
+
+
+@contextmanager
+def timed(phase, **fields):
+    """
+    Records the block's duration in smartcareer_phase_seconds{phase=...} and logs it at
+    DEBUG with any extra fields:
+
+        with timed("pdf_extract", pages=12):
+            ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        phase_seconds.observe(elapsed, phase=phase)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("phase %s took %.1f ms", phase, elapsed * 1000,
+                         extra={"phase": phase, "duration_ms": round(elapsed * 1000, 1), **fields})
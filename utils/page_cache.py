@@ -0,0 +1,248 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import request, session, make_response
+from flask_login import current_user
+from sqlalchemy import event
+
+
+# Backends store and return bytes: get(key), set(key, value, ttl=None), clear()
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTL. Only sees invalidations made by this process."""
+
+    def __init__(self, max_items=1000):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.items.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at < time.time():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.items[key] = (value, time.time() + ttl if ttl else None)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+class SQLiteBackend:
+    """
+    Shared across the processes of one host through a SQLite file. Stands in for a
+    networked cache in tests and single-machine deployments.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # readers in other processes don't block on writes
+            conn.execute("CREATE TABLE IF NOT EXISTS page_cache "
+                         "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM page_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO page_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, value, time.time() + ttl if ttl else None))
+            conn.execute("DELETE FROM page_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM page_cache")
+
+
+class RedisBackend:
+    """Shared cache for multi-host deployments (requires the `redis` package)."""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def clear(self):
+        for key in self.client.scan_iter("page:*"):
+            self.client.delete(key)
+
+
+class PageCache:
+    """
+    Caches rendered per-user pages and answers conditional requests.
+
+    Every cache key includes the user's data version: a timestamp bumped whenever a
+    commit touches one of their resumes, analyses, cover letters or interview preps.
+    A write therefore makes every cached page of that user unreachable at once, and
+    the version doubles as the page's Last-Modified.
+
+    Backends (config PAGE_CACHE_BACKEND): "sqlite" (default; PAGE_CACHE_URL is the file
+    path), "redis" (PAGE_CACHE_URL is the redis:// URL), "memory" or "none". Versions live
+    in the backend, so only the shared ones see writes made by other processes (web
+    workers, flask batch-analyze); "memory" is for a single process only.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 600
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+        self.listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("PAGE_CACHE_BACKEND", "sqlite")
+        url = app.config.get("PAGE_CACHE_URL")
+        self.ttl = app.config.get("PAGE_CACHE_TTL", 600)
+        if kind == "memory":
+            self.backend = MemoryBackend(app.config.get("PAGE_CACHE_MAX_ITEMS", 1000))
+        elif kind == "sqlite":
+            self.backend = SQLiteBackend(url)
+        elif kind == "redis":
+            self.backend = RedisBackend(url)
+        elif kind == "none":
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown PAGE_CACHE_BACKEND: {kind}")
+        app.extensions["page_cache"] = self
+
+    # -- invalidation --------------------------------------------------------
+
+    def version(self, user_id):
+        """Nanosecond timestamp of the user's last write (set to now if unknown); None when disabled."""
+        if self.backend is None:
+            return None
+        key = f"page:version:{user_id}"
+        value = self.backend.get(key)
+        if value is None:
+            value = str(time.time_ns()).encode()
+            self.backend.set(key, value)
+        return int(value)
+
+    def on_invalidate(self, listener):
+        """Calls listener(user_id) whenever a user's pages are invalidated (even with no backend)."""
+        self.listeners.append(listener)
+
+    def invalidate_user(self, user_id):
+        for listener in self.listeners:
+            listener(user_id)
+        if self.backend is not None:
+            self.backend.set(f"page:version:{user_id}", str(time.time_ns()).encode())
+
+    def watch(self, session, models, owner):
+        """
+        Invalidates users' pages after any commit that inserts, updates or deletes
+        instances of `models`; owner(instance) returns the user id.
+        """
+        @event.listens_for(session, "before_flush")
+        def collect(sess, flush_context, instances):
+            touched = sess.info.setdefault("page_cache_users", set())
+            for obj in list(sess.new) + list(sess.dirty) + list(sess.deleted):
+                if isinstance(obj, models):
+                    user_id = owner(obj)
+                    if user_id is not None:
+                        touched.add(user_id)
+
+        @event.listens_for(session, "after_commit")
+        def invalidate(sess):
+            for user_id in sess.info.pop("page_cache_users", ()):
+                self.invalidate_user(user_id)
+
+        @event.listens_for(session, "after_rollback")
+        def discard(sess):
+            sess.info.pop("page_cache_users", None)
+
+    # -- responses -----------------------------------------------------------
+
+    def cached(self, view):
+        """
+        Route decorator (place under @login_required). Serves 200 responses from the
+        cache and replies 304 when the browser's ETag/Last-Modified is still current.
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.backend is None or not current_user.is_authenticated or "_flashes" in session:
+                return view(*args, **kwargs)
+
+            user_id = current_user.get_id()
+            version = self.version(user_id)
+            token = hashlib.sha256(str(session.get("csrf_token", "")).encode()).hexdigest()[:16]
+            key = "page:" + hashlib.sha256(
+                f"{user_id}|{version}|{token}|{request.full_path}".encode()).hexdigest()
+
+            etag = key[len("page:"):][:32]
+            if request.if_none_match.contains_weak(etag):  # weak: compression marks ETags W/
+                # Still current: no cache lookup or rendering needed
+                self.stats["not_modified"] += 1
+                response = make_response("", 304)
+            else:
+                raw = self.backend.get(key)
+                if raw is not None:
+                    entry = json.loads(raw)
+                    self.stats["hits"] += 1
+                    response = make_response(base64.b64decode(entry["body"]), 200)
+                    response.mimetype = entry["mimetype"]
+                else:
+                    self.stats["misses"] += 1
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough:
+                        return response
+                    entry = {"body": base64.b64encode(response.get_data()).decode(), "mimetype": response.mimetype}
+                    self.backend.set(key, json.dumps(entry).encode(), self.ttl)
+
+            response.set_etag(etag)
+            response.last_modified = version / 1e9
+            response.headers["Cache-Control"] = "private, no-cache"
+            response.headers["Vary"] = "Cookie"
+            if response.status_code == 200:
+                response = response.make_conditional(request)  # If-Modified-Since
+                if response.status_code == 304:
+                    self.stats["not_modified"] += 1
+            return response
+        return wrapper
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+page_cache = PageCache()
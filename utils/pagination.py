@@ -0,0 +1,43 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns (created_at, id), or None if the cursor is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(query, model, cursor=None, limit=20):
+    """
+    Newest-first keyset pagination on (created_at, id).
+    Cost stays constant however deep the user pages, unlike OFFSET.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    position = decode_cursor(cursor)
+    if position:
+        created_at, row_id = position
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return items, next_cursor
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from functools import lru_cache
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# werkzeug method string: "scrypt:<n>:<r>:<p>" or "pbkdf2:<hash>:<iterations>"
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+# Hashes run on this many threads (hashlib releases the GIL); requests beyond
+# workers + queue are turned away instead of piling up behind a login burst
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(2, os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 32))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+# Failed logins allowed per account within the window (seconds)
+LOGIN_MAX_ATTEMPTS = int(os.getenv("LOGIN_MAX_ATTEMPTS", 5))
+LOGIN_ATTEMPT_WINDOW = int(os.getenv("LOGIN_ATTEMPT_WINDOW", 300))
+
+
+class HashingBusy(Exception):
+    """The hashing pool is saturated; the client should retry shortly."""
+
+
+class TooManyAttempts(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Too many failed login attempts. Try again in {int(retry_after) + 1} seconds.")
+        self.retry_after = retry_after
+
+
+@lru_cache(maxsize=None)
+def method_prefix(method):
+    """The parameter prefix werkzeug stores for `method` (e.g. "scrypt" -> "scrypt:32768:8:1")."""
+    return generate_password_hash("", method).split("$", 1)[0]
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool, off the request thread."""
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS,
+                 queue_size=PASSWORD_HASH_QUEUE, timeout=PASSWORD_HASH_TIMEOUT):
+        self.method = method
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self.pool = None
+        self.lock = threading.Lock()
+        self.stats = {"hashed": 0, "verified": 0, "rejected_busy": 0}
+
+    def _get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self.pool
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.stats["rejected_busy"] += 1
+            raise HashingBusy("Too many sign-ins in progress. Please try again in a moment.")
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError:
+            raise HashingBusy("Sign-in timed out. Please try again in a moment.")
+
+    def hash(self, password):
+        result = self._run(generate_password_hash, password, self.method)
+        with self.lock:
+            self.stats["hashed"] += 1
+        return result
+
+    def verify(self, pwhash, password):
+        result = self._run(check_password_hash, pwhash, password)
+        with self.lock:
+            self.stats["verified"] += 1
+        return result
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` was made with different parameters than the configured method."""
+        return pwhash.split("$", 1)[0] != method_prefix(self.method)
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, method=self.method, workers=self.workers)
+
+
+class MemoryAttemptStore:
+    """Failure times per account in this process only; the oldest accounts are forgotten beyond `max_keys`."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self.failures = OrderedDict()  # key -> deque of failure times
+        self.lock = threading.Lock()
+
+    def recent(self, key, since):
+        """(count, oldest) of `key`'s failures after `since`."""
+        with self.lock:
+            times = self.failures.get(key)
+            if not times:
+                return 0, None
+            while times and times[0] <= since:
+                times.popleft()
+            return len(times), times[0] if times else None
+
+    def add(self, key, now, since, keep):
+        with self.lock:
+            times = self.failures.setdefault(key, deque())
+            times.append(now)
+            self.failures.move_to_end(key)
+            while len(times) > keep or (times and times[0] <= since):
+                times.popleft()
+            while len(self.failures) > self.max_keys:
+                self.failures.popitem(last=False)
+
+    def clear(self, key):
+        with self.lock:
+            self.failures.pop(key, None)
+
+
+class DatabaseAttemptStore:
+    """Failure rows in the application database (models.LoginFailure), shared by every process."""
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+
+    def recent(self, key, since):
+        model = self.model
+        return self.db.session.query(self.db.func.count(model.id), self.db.func.min(model.failed_at)).filter(
+            model.account == key, model.failed_at > since).one()
+
+    def add(self, key, now, since, keep):
+        self.db.session.add(self.model(account=key, failed_at=now))
+        # Expired rows of every account go here, so the table stays the size of one window
+        self.db.session.execute(self.db.delete(self.model).where(self.model.failed_at <= since))
+        self.db.session.commit()
+
+    def clear(self, key):
+        self.db.session.execute(self.db.delete(self.model).where(self.model.account == key))
+        self.db.session.commit()
+
+
+class AttemptLimiter:
+    """
+    Sliding-window count of failed logins per account (e.g. email). Failures are kept in
+    memory until init_app() selects a store (config LOGIN_ATTEMPTS_BACKEND): "database"
+    (default; every worker and restart shares the count) or "memory" (per process, so
+    N workers allow N times LOGIN_MAX_ATTEMPTS and a restart resets the count).
+    """
+
+    def __init__(self, max_attempts=LOGIN_MAX_ATTEMPTS, window=LOGIN_ATTEMPT_WINDOW, max_keys=100000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.store = MemoryAttemptStore(max_keys)
+
+    def init_app(self, app, db, model):
+        backend = app.config.get("LOGIN_ATTEMPTS_BACKEND", "database")
+        if backend == "database":
+            self.store = DatabaseAttemptStore(db, model)
+        elif backend != "memory":
+            raise ValueError(f"Unknown LOGIN_ATTEMPTS_BACKEND: {backend}")
+        app.extensions["login_attempts"] = self
+
+    def check(self, key):
+        """Raises TooManyAttempts while `key` has used up its failed attempts."""
+        if self.max_attempts <= 0:
+            return
+        now = time.time()
+        count, oldest = self.store.recent(key, now - self.window)
+        if count >= self.max_attempts:
+            raise TooManyAttempts(oldest + self.window - now)
+
+    def failure(self, key):
+        now = time.time()
+        self.store.add(key, now, now - self.window, self.max_attempts)
+
+    def reset(self, key):
+        self.store.clear(key)
+
+
+password_hasher = PasswordHasher()
+login_attempts = AttemptLimiter()
@@ -1,22 +1,91 @@
 import os
+import time
+import logging
 import pdfplumber
-def extract_text_from_pdf(file_path):
+import pypdfium2 as pdfium
+from utils.metrics import timed
+
+logger = logging.getLogger("smartcareer.pdf")
+
+# Budget so a pathological upload can't monopolise a worker
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", 20))
+# pdfium pages with less text than this (or mostly undecodable glyphs) are retried with pdfplumber
+MIN_PAGE_CHARS = 20
+
+def _needs_layout_fallback(text):
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return True
+    return stripped.count("�") > len(stripped) * 0.1
+
+
+def _iter_range(file_path, start, stop):
     """
-    Extracts text from a PDF file using pdfplumber.
-    file_path: string path to the PDF file
+    Yields the text of pages [start, stop) using pypdfium2, falling back to pdfplumber
+    per page when pdfium's text looks empty or garbled.
+    """
+    plumber = None
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            text = textpage.get_text_bounded().replace("\r\n", "\n")
+            textpage.close()
+            page.close()
+
+            if _needs_layout_fallback(text):
+                if plumber is None:
+                    plumber = pdfplumber.open(file_path)
+                text = plumber.pages[index].extract_text() or text
+
+            yield text
+    finally:
+        if plumber is not None:
+            plumber.close()
+        pdf.close()
+
+
+def count_pages(file_path):
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def iter_pdf_pages(file_path, max_pages=PDF_MAX_PAGES, time_budget=PDF_TIME_BUDGET):
+    """
+    Yields the text of each page in order.
+    Stops after `max_pages` pages or once `time_budget` seconds have elapsed.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    text = ""
+    deadline = time.monotonic() + time_budget
     try:
-        # ✅ Open the file using context manager
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        total = min(count_pages(file_path), max_pages)
+        pages = _iter_range(file_path, 0, total)
+        try:
+            for index, text in enumerate(pages):
+                yield text
+                if time.monotonic() > deadline:
+                    logger.warning("PDF time budget exhausted after %d pages: %s", index + 1, file_path)
+                    return
+        finally:
+            pages.close()
+    except FileNotFoundError:
+        raise
     except Exception as e:
-        raise RuntimeError(f"Error reading PDF with pdfplumber: {str(e)}")
+        raise RuntimeError(f"Error reading PDF: {str(e)}")
+
 
-    return text.strip()
\ No newline at end of file
+def extract_text_from_pdf(file_path, max_pages=PDF_MAX_PAGES, time_budget=PDF_TIME_BUDGET):
+    """
+    Extracts text from a PDF file (pypdfium2 fast path, pdfplumber for layout-sensitive pages).
+    file_path: string path to the PDF file
+    """
+    with timed("pdf_extract"):
+        pages = [text for text in iter_pdf_pages(file_path, max_pages, time_budget) if text]
+    return "\n".join(pages).strip()
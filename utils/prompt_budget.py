@@ -0,0 +1,156 @@
+import os
+import re
+from collections import Counter
+
+from utils.rate_limiter import estimate_tokens
+
+# Input token budgets per prompt. The old character slices were ~2500/2000+1250/1500+750
+# tokens; ranking sections by relevance lets a smaller budget keep what matters.
+ANALYSIS_RESUME_TOKENS = int(os.getenv("PROMPT_ANALYSIS_RESUME_TOKENS", 2000))
+COVER_LETTER_RESUME_TOKENS = int(os.getenv("PROMPT_COVER_LETTER_RESUME_TOKENS", 1500))
+COVER_LETTER_JOB_TOKENS = int(os.getenv("PROMPT_COVER_LETTER_JOB_TOKENS", 1000))
+INTERVIEW_RESUME_TOKENS = int(os.getenv("PROMPT_INTERVIEW_RESUME_TOKENS", 1200))
+INTERVIEW_JOB_TOKENS = int(os.getenv("PROMPT_INTERVIEW_JOB_TOKENS", 600))
+
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "about", "about me", "professional summary",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "education", "skills", "technical skills", "core competencies", "projects", "personal projects",
+    "certifications", "certificates", "awards", "achievements", "publications", "languages",
+    "interests", "volunteering", "volunteer experience", "references", "training", "courses",
+}
+# Sections kept ahead of anything ranked by relevance
+PINNED_SECTIONS = {"summary", "profile", "objective", "professional summary", "skills", "technical skills",
+                   "core competencies"}
+
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was
+were will with you your we us they who what which while within into about over under per via
+""".split())
+
+# "Page 2", "Page 2 of 3", "Page 2/3", "2 of 3"; bare numbers and "06/2021" are usually dates
+PAGE_MARKER = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s+of\s+\d+)$", re.IGNORECASE)
+WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+
+def normalize_whitespace(text):
+    """Collapses runs of spaces/tabs, strips line ends and limits blank lines to one."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\u00a0", " ")
+    text = re.sub(r"[^\S\n]+", " ", text)
+    lines = [line.strip() for line in text.split("\n")]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def drop_boilerplate(text, repeat_threshold=3):
+    """
+    Removes what PDF extraction leaves behind on every page: page numbers, short
+    header/footer lines repeated `repeat_threshold`+ times (only the first is kept),
+    and consecutive duplicate lines.
+    """
+    lines = text.split("\n")
+    counts = Counter(line.lower() for line in lines if line)
+    seen = set()
+    kept = []
+    for line in lines:
+        key = line.lower()
+        if line and PAGE_MARKER.match(line):
+            continue
+        if line and counts[key] >= repeat_threshold and len(line) <= 80:
+            if key in seen:
+                continue
+            seen.add(key)
+        if line and kept and kept[-1].lower() == key:
+            continue
+        kept.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def _heading(line):
+    bare = line.strip().rstrip(":").strip().lower()
+    if bare in SECTION_HEADINGS:
+        return bare
+    if 2 < len(line) <= 40 and line.isupper() and not any(ch.isdigit() for ch in line):
+        return bare
+    return None
+
+
+def split_sections(text):
+    """Returns [(heading, body)] in document order; text before the first heading is ("", ...)."""
+    sections = [["", []]]
+    for line in text.split("\n"):
+        heading = _heading(line) if line else None
+        if heading:
+            sections.append([heading, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines).strip()) for heading, lines in sections if "\n".join(lines).strip()]
+
+
+def terms(text):
+    return [w for w in WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+def relevance(section_text, query_terms):
+    """Share of the query's distinct terms the section mentions, with a small density bonus."""
+    if not query_terms:
+        return 0.0
+    words = terms(section_text)
+    if not words:
+        return 0.0
+    hits = query_terms.intersection(words)
+    density = sum(1 for w in words if w in query_terms) / len(words)
+    return len(hits) / len(query_terms) + 0.5 * density
+
+
+def truncate_to_tokens(text, budget):
+    """Cuts at the last line (or word) boundary that fits `budget` estimated tokens."""
+    if estimate_tokens(text) <= budget:
+        return text
+    limit = max(0, (budget - 1) * 4)
+    cut = text[:limit]
+    boundary = cut.rfind("\n")
+    if boundary < limit // 2:
+        boundary = cut.rfind(" ")
+    return (cut[:boundary] if boundary > 0 else cut).rstrip()
+
+
+def compact(text, budget, query=None):
+    """
+    Cleans extracted text and fits it into `budget` estimated tokens.
+
+    With a `query` (e.g. the job description), sections are ranked by relevance to it:
+    the opening block (name/contact, even when an all-caps name line reads as a heading)
+    and summary/skills sections come first, then the rest in order of relevance. Selected sections keep their original document order;
+    the first one that does not fit is truncated at a line boundary.
+    """
+    text = drop_boilerplate(normalize_whitespace(text or ""))
+    if estimate_tokens(text) <= budget:
+        return text
+    if not query:
+        return truncate_to_tokens(text, budget)
+
+    sections = split_sections(text)
+    query_terms = set(terms(query))
+
+    def priority(indexed):
+        index, (heading, body) = indexed
+        if index == 0:
+            return (0, 0.0)
+        if heading in PINNED_SECTIONS:
+            return (1, 0.0)
+        return (2, -relevance(body, query_terms))
+
+    chosen = {}
+    remaining = budget
+    for index, (heading, body) in sorted(enumerate(sections), key=priority):
+        cost = estimate_tokens(body) + 1
+        if cost <= remaining:
+            chosen[index] = body
+            remaining -= cost
+        elif remaining > 50:
+            chosen[index] = truncate_to_tokens(body, remaining - 1)
+            remaining = 0
+        if remaining <= 50:
+            break
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
@@ -0,0 +1,202 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", 60))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", 1_000_000))
+GEMINI_MAX_IN_FLIGHT = int(os.getenv("GEMINI_MAX_IN_FLIGHT", 4))
+GEMINI_ACQUIRE_TIMEOUT = float(os.getenv("GEMINI_ACQUIRE_TIMEOUT", 30))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5))
+GEMINI_BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", 30))
+
+
+class GeminiUnavailable(RuntimeError):
+    """Raised without calling Gemini: circuit open, or quota wait exceeded the timeout."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` tokens/minute,
+    holding at most `per_minute` tokens (one minute of burst).
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1, timeout=None):
+        """Blocks until `amount` tokens are available; returns False on timeout."""
+        amount = min(amount, self.capacity)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = max(self.paused_until - now, (amount - self.tokens) / self.rate)
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0 or wait > remaining:
+                        return False
+                    wait = min(wait, remaining)
+                self.cond.wait(wait)
+
+    def pause(self, seconds):
+        """Stops handing out tokens for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def available(self):
+        with self.cond:
+            self._refill(time.monotonic())
+            return round(self.tokens, 1)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open rejects calls for
+    `reset_timeout` seconds, then half-open lets one probe through.
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def cancel_probe(self):
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class GeminiGovernor:
+    """
+    Process-wide admission control for Gemini calls: requests/minute and tokens/minute
+    buckets, a cap on concurrent in-flight calls, and a circuit breaker.
+    """
+
+    def __init__(self, rpm=GEMINI_RPM, tpm=GEMINI_TPM, max_in_flight=GEMINI_MAX_IN_FLIGHT,
+                 acquire_timeout=GEMINI_ACQUIRE_TIMEOUT, breaker_threshold=GEMINI_BREAKER_THRESHOLD,
+                 breaker_reset=GEMINI_BREAKER_RESET):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_in_flight = max_in_flight
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.acquire_timeout = acquire_timeout
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {"admitted": 0, "throttled": 0, "rejected_open": 0, "rate_limited_429": 0,
+                         "failures": 0, "wait_seconds": 0.0}
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    @contextmanager
+    def slot(self, estimated_tokens):
+        """
+        Admits one call or raises GeminiUnavailable. The caller must report the outcome
+        with record_success()/record_failure() inside the block.
+        """
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise GeminiUnavailable("Gemini is currently unavailable. Please try again shortly.")
+
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+        if not (self.requests.acquire(1, self.acquire_timeout)
+                and self.tokens.acquire(estimated_tokens, max(0.0, deadline - time.monotonic()))
+                and self.slots.acquire(timeout=max(0.0, deadline - time.monotonic()))):
+            self._count("throttled")
+            self.breaker.cancel_probe()
+            raise GeminiUnavailable("Too many AI requests right now. Please try again shortly.")
+
+        self._count("wait_seconds", time.monotonic() - started)
+        self._count("admitted")
+        with self.lock:
+            self.in_flight += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+            self.slots.release()
+            self.breaker.cancel_probe()  # a probe that raised without an outcome may be retried
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self._count("failures")
+        self.breaker.record_failure()
+
+    def record_rate_limited(self, retry_after):
+        """A 429: make every caller wait out Retry-After instead of retrying into it."""
+        self._count("rate_limited_429")
+        self.requests.pause(retry_after)
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = self.in_flight
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["max_in_flight"] = self.max_in_flight
+        stats["requests_available"] = self.requests.available()
+        stats["tokens_available"] = self.tokens.available()
+        stats["breaker_state"] = self.breaker.state
+        stats["breaker_failures"] = self.breaker.failures
+        return stats
+
+
+def estimate_tokens(text, max_output_tokens=0):
+    """Rough token estimate (~4 characters per token) plus the output allowance."""
+    return len(text) // 4 + 1 + max_output_tokens
+
+
+governor = GeminiGovernor()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CACHE_DB_PATH = os.getenv(
+    "GEMINI_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "gemini_cache.db")
+)
+CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MEMORY_ITEMS = int(os.getenv("GEMINI_CACHE_MEMORY_ITEMS", 256))
+CACHE_DISK_MAX_BYTES = int(os.getenv("GEMINI_CACHE_DISK_MAX_BYTES", 50 * 1024 * 1024))
+
+
+def make_cache_key(model, generation_config, prompt):
+    """
+    Content-addressed key: SHA-256 over the model, generationConfig and prompt.
+    """
+    payload = json.dumps(
+        {"model": model, "generationConfig": generation_config, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for Gemini responses.
+    - Memory tier: LRU of up to `memory_items` entries.
+    - Disk tier: SQLite table capped at `disk_max_bytes`, oldest-accessed rows evicted first.
+    Both tiers honour `ttl` (seconds).
+    """
+
+    def __init__(self, path=CACHE_DB_PATH, ttl=CACHE_TTL_SECONDS,
+                 memory_items=CACHE_MEMORY_ITEMS, disk_max_bytes=CACHE_DISK_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.memory_items = memory_items
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " size INTEGER NOT NULL,"
+                    " expires_at REAL NOT NULL,"
+                    " accessed_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                        self._remember(key, row[0], row[1])
+                    return row[0]
+                if row:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self.stats["sets"] += 1
+            self._remember(key, value, expires_at)
+
+        if self.path:
+            size = len(value.encode("utf-8"))
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, expires_at, now)
+                )
+                self._evict_disk(conn, now)
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _remember(self, key, value, expires_at):
+        # Caller holds self._lock
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.disk_max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses")
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["memory_items"] = len(self._memory)
+        return stats
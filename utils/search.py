@@ -0,0 +1,243 @@
+import html
+import re
+
+from sqlalchemy import Text, cast, event, text
+
+WORD = re.compile(r"\w+", re.UNICODE)
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+def document_text(value):
+    """Flattens generated content (plain text or an interview-prep dict/list) into searchable text."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return "\n".join(document_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return "\n".join(document_text(v) for v in value)
+    return str(value)
+
+
+def highlight(snippet):
+    """Escapes a snippet for HTML, turning the match markers into <mark> tags."""
+    escaped = html.escape(snippet)
+    return escaped.replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+class FTS5Backend:
+    """
+    SQLite FTS5 table `document_fts` holding one row per cover letter / interview prep.
+    The owner column is indexed too, so a user's search never scans other users' rows.
+    Rows are keyed by rowid = doc_id * KIND_SLOTS + kind code, so updates and deletes
+    touch a single row instead of scanning the (unindexed) kind/doc_id columns.
+    """
+
+    name = "fts5"
+    KIND_SLOTS = 16
+
+    def __init__(self, kinds):
+        self.kinds = kinds  # kind -> code (registration order), shared with SearchIndex
+
+    def rowid(self, kind, doc_id):
+        return int(doc_id) * self.KIND_SLOTS + self.kinds[kind]
+
+    def ensure_schema(self, conn):
+        """Creates the FTS table; returns True if it did not exist (needs a backfill)."""
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'document_fts'")).first()
+        if exists:
+            return False
+        conn.execute(text("DROP TABLE IF EXISTS document_search"))  # earlier layout, keyed by doc_id
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE document_fts USING fts5("
+            "kind UNINDEXED, doc_id UNINDEXED, created_at UNINDEXED, owner, "
+            "job_title, job_description, content, tokenize = 'porter unicode61')"
+        ))
+        return True
+
+    def add(self, conn, kind, doc):
+        conn.execute(text(
+            "INSERT INTO document_fts (rowid, kind, doc_id, created_at, owner, job_title, job_description, content) "
+            "VALUES (:rowid, :kind, :doc_id, :created_at, :owner, :job_title, :job_description, :content)"
+        ), {**doc, "kind": kind, "owner": f"u{doc['user_id']}", "rowid": self.rowid(kind, doc["doc_id"]),
+            "created_at": doc["created_at"].isoformat() if doc["created_at"] else None})
+
+    def remove(self, conn, kind, doc_id):
+        conn.execute(text("DELETE FROM document_fts WHERE rowid = :rowid"), {"rowid": self.rowid(kind, doc_id)})
+
+    def clear(self, conn):
+        conn.execute(text("DELETE FROM document_fts"))
+
+    @staticmethod
+    def match_expression(query, user_id):
+        # User input is reduced to quoted prefix terms, so FTS5 query syntax can't be injected
+        terms = " ".join(f'"{word}"*' for word in WORD.findall(query.lower())[:12])
+        return f"owner : u{int(user_id)} AND {{job_title job_description content}} : ({terms})"
+
+    def search(self, conn, user_id, query, kind=None, limit=20, offset=0):
+        if not WORD.search(query or ""):
+            return []
+        # Title matches weigh most, then the generated content, then the pasted job description
+        sql = ("SELECT kind, doc_id, created_at, job_title, "
+               "snippet(document_fts, 6, :start, :end, '…', 16) AS content_snippet, "
+               "snippet(document_fts, 5, :start, :end, '…', 16) AS description_snippet, "
+               "bm25(document_fts, 0, 0, 0, 0, 10.0, 1.0, 4.0) AS rank "
+               "FROM document_fts WHERE document_fts MATCH :match")
+        params = {"match": self.match_expression(query, user_id), "start": MARK_START, "end": MARK_END,
+                  "limit": limit, "offset": offset}
+        if kind:
+            sql += " AND kind = :kind"
+            params["kind"] = kind
+        sql += " ORDER BY rank LIMIT :limit OFFSET :offset"
+        hits = []
+        for row in conn.execute(text(sql), params).mappings():
+            snippet = row["content_snippet"]
+            if MARK_START not in snippet and MARK_START in row["description_snippet"]:
+                snippet = row["description_snippet"]
+            hits.append({
+                "kind": row["kind"],
+                "id": int(row["doc_id"]),
+                "job_title": row["job_title"],
+                "created_at": row["created_at"],
+                "snippet": highlight(snippet),
+                "score": round(-row["rank"], 3),
+            })
+        return hits
+
+
+class LikeBackend:
+    """
+    Fallback for databases without a configured full-text engine: case-insensitive
+    LIKE over the source tables (a scan per query, fine for small installs).
+    Nothing to maintain, so add/remove are no-ops.
+    """
+
+    name = "like"
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def ensure_schema(self, conn):
+        return False
+
+    def add(self, conn, kind, doc):
+        pass
+
+    def remove(self, conn, kind, doc_id):
+        pass
+
+    def clear(self, conn):
+        pass
+
+    def search(self, conn, user_id, query, kind=None, limit=20, offset=0):
+        words = WORD.findall((query or "").lower())[:12]
+        if not words:
+            return []
+        hits = []
+        for source_kind, model in self.sources.items():
+            if kind and kind != source_kind:
+                continue
+            content = cast(model.content, Text)
+            rows = (model.query
+                    .filter(model.user_id == user_id,
+                            *[model.job_title.ilike(f"%{w}%") | model.job_description.ilike(f"%{w}%")
+                              | content.ilike(f"%{w}%") for w in words])
+                    .all())
+            for row in rows:
+                body = document_text(row.content)
+                if words[0] not in body.lower() and words[0] in row.job_description.lower():
+                    body = row.job_description
+                position = body.lower().find(words[0])
+                start = max(0, position - 60)
+                snippet = body[start:start + 160] if position >= 0 else body[:160]
+                title_hits = sum(w in row.job_title.lower() for w in words)
+                hits.append({
+                    "kind": source_kind, "id": row.id, "job_title": row.job_title,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                    "snippet": highlight(re.sub(f"({'|'.join(map(re.escape, words))})",
+                                                MARK_START + r"\1" + MARK_END, snippet, flags=re.IGNORECASE)),
+                    "score": float(title_hits),
+                })
+        hits.sort(key=lambda hit: hit["created_at"] or "", reverse=True)
+        hits.sort(key=lambda hit: hit["score"], reverse=True)  # stable: newest first among equal scores
+        return hits[offset:offset + limit]
+
+
+class SearchIndex:
+    """
+    Full-text search over a user's generated documents.
+
+    Models are registered with watch(kind, model, to_document); mapper events keep the
+    index in step on insert, update and delete, inside the same transaction as the row.
+    Backend (config SEARCH_BACKEND): "auto" (FTS5 on SQLite, LIKE elsewhere), "fts5" or "like".
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.sources = {}
+        self.serializers = {}
+        self.kinds = {}
+
+    def init_app(self, app, db):
+        self.db = db
+        choice = app.config.get("SEARCH_BACKEND", "auto")
+        with app.app_context():
+            dialect = db.engine.dialect.name
+        if choice == "auto":
+            choice = "fts5" if dialect == "sqlite" else "like"
+        if choice == "fts5":
+            self.backend = FTS5Backend(self.kinds)
+        elif choice == "like":
+            self.backend = LikeBackend(self.sources)
+        else:
+            raise ValueError(f"Unknown SEARCH_BACKEND: {choice}")
+        app.extensions["search_index"] = self
+
+    def watch(self, kind, model, to_document):
+        """
+        to_document(instance) -> dict(doc_id, user_id, created_at, job_title, job_description, content).
+        Kinds are numbered in registration order (part of the FTS5 rowid): append new ones, or
+        run `flask reindex-search` after reordering.
+        """
+        self.sources[kind] = model
+        self.kinds.setdefault(kind, len(self.kinds))
+        self.serializers[kind] = to_document
+
+        @event.listens_for(model, "after_insert")
+        def on_insert(mapper, connection, target):
+            self.backend.add(connection, kind, to_document(target))
+
+        @event.listens_for(model, "after_update")
+        def on_update(mapper, connection, target):
+            self.backend.remove(connection, kind, target.id)
+            self.backend.add(connection, kind, to_document(target))
+
+        @event.listens_for(model, "after_delete")
+        def on_delete(mapper, connection, target):
+            self.backend.remove(connection, kind, target.id)
+
+    def ensure_index(self):
+        """Creates the index on first run and fills it from the existing rows."""
+        with self.db.engine.begin() as conn:
+            if self.backend.ensure_schema(conn):
+                self._fill(conn)
+
+    def rebuild(self):
+        with self.db.engine.begin() as conn:
+            self.backend.ensure_schema(conn)
+            self.backend.clear(conn)
+            return self._fill(conn)
+
+    def _fill(self, conn):
+        count = 0
+        for kind, model in self.sources.items():
+            for row in model.query.yield_per(500):
+                self.backend.add(conn, kind, self.serializers[kind](row))
+                count += 1
+        return count
+
+    def search(self, user_id, query, kind=None, limit=20, offset=0):
+        return self.backend.search(self.db.session.connection(), user_id, query, kind, limit, offset)
+
+
+search_index = SearchIndex()
@@ -0,0 +1,114 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process locking is unavailable
+    fcntl = None
+
+LOCK_DIR = os.getenv(
+    "GEMINI_LOCK_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance", "gemini_locks")
+)
+
+
+class _Call:
+    """One in-flight upstream request; followers block on `done` and share its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.followers = 0
+
+    def resolve(self, value):
+        self.value = value
+        self.done.set()
+
+    def fail(self, error):
+        self.error = error
+        self.done.set()
+
+    def result(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise RuntimeError("Timed out waiting for an identical in-flight request.")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller (leader)
+    does the work, callers arriving while it runs wait and receive the same result
+    or exception. Nothing is remembered once the call finishes; that is the cache's job.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def claim(self, key):
+        """Returns (call, is_leader). A leader must finish with `release(key, call)`."""
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.stats["coalesced"] += 1
+                return call, False
+            call = self.calls[key] = _Call()
+            self.stats["leaders"] += 1
+            return call, True
+
+    def release(self, key, call):
+        with self.lock:
+            if self.calls.get(key) is call:
+                del self.calls[key]
+        if not call.done.is_set():
+            call.fail(RuntimeError("The identical in-flight request was abandoned."))
+
+    def do(self, key, fn, timeout=None):
+        call, leader = self.claim(key)
+        if not leader:
+            return call.result(timeout)
+        try:
+            call.resolve(fn())
+        except Exception as e:
+            call.fail(e)
+            raise
+        finally:
+            self.release(key, call)
+        return call.value
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, in_flight=len(self.calls))
+
+
+@contextmanager
+def process_lock(key, lock_dir=LOCK_DIR):
+    """
+    Exclusive lock shared by every process on this host (flock on a per-key file).
+    A no-op where fcntl is unavailable.
+
+    The file is removed on release. A process that opened the old file may then run
+    alongside one holding a new file; callers re-check the shared cache after taking
+    the lock, so the worst case is one duplicate request, never a wrong result.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(lock_dir, exist_ok=True)
+    path = os.path.join(lock_dir, f"{key}.lock")
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            fcntl.flock(handle, fcntl.LOCK_UN)
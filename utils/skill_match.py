@@ -0,0 +1,184 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+# How long the vocabulary built from stored analyses is reused before reloading
+SKILL_VOCAB_TTL = int(os.getenv("SKILL_VOCAB_TTL", 300))
+MAX_SKILL_WORDS = 4
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Built-in vocabulary, so matching works before many resumes have been analysed. Words common in
+# ordinary prose ("sales team", "job security", "testing the market") are seeded as specific phrases.
+SEED_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Golang", "Rust", "C++", "C#", "Ruby", "PHP", "Kotlin",
+    "Swift", "Scala", "SQL", "Bash", "HTML", "CSS", "React", "Angular", "Vue", "Node.js", "Django",
+    "Flask", "FastAPI", "Spring", "Spring Boot", ".NET", "Ruby on Rails", "GraphQL", "REST API",
+    "gRPC", "PostgreSQL", "MySQL", "SQLite", "MongoDB", "Redis", "Elasticsearch", "Kafka", "RabbitMQ",
+    "Celery", "Docker", "Kubernetes", "Terraform", "Ansible", "AWS", "Azure", "GCP", "Linux", "Git",
+    "CI/CD", "Jenkins", "GitHub Actions", "Prometheus", "Grafana", "Microservices", "Machine Learning",
+    "Deep Learning", "NLP", "Computer Vision", "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy",
+    "Spark", "Airflow", "Data Analysis", "Data Engineering", "Tableau", "Power BI", "Microsoft Excel", "Statistics",
+    "Agile", "Scrum", "Jira", "Project Management", "Product Management", "Leadership", "Communication",
+    "Stakeholder Management", "Mentoring", "Test Automation", "Unit Testing", "Selenium", "Cybersecurity",
+    "Application Security", "OAuth", "Figma", "UX Design", "SEO", "Salesforce", "Accounting", "Customer Service", "B2B Sales", "Marketing",
+]
+
+
+def tokenize(text):
+    return TOKEN.findall((text or "").lower())
+
+
+def skill_key(name):
+    return " ".join(tokenize(name))
+
+
+class SparseRows:
+    """
+    Rows of a sparse matrix in CSR layout (indptr, indices, data as NumPy arrays),
+    the same layout scipy.sparse.csr_matrix uses.
+    """
+
+    def __init__(self, indptr, indices, data, n_cols):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, n_cols)
+
+    def row_ids(self):
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def row(self, i):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+
+class SkillVocabulary:
+    """
+    Skill phrases with IDF weights. Skills most resumes list (e.g. "Communication")
+    weigh less than distinctive ones; seed skills nobody has listed yet get the maximum.
+    """
+
+    def __init__(self, names, doc_freq=None, total_docs=0):
+        doc_freq = doc_freq or {}
+        self.keys, self.names = [], []
+        self.index = {}
+        for name in names:
+            key = skill_key(name)
+            # Single letters ("C", "R") would match every stray letter once lowercased
+            if len(key) > 1 and key not in self.index and len(key.split()) <= MAX_SKILL_WORDS:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+                self.names.append(name.strip())
+        self.prefixes = {key.split()[0] for key in self.keys if " " in key}
+        self.idf = np.array([math.log((1 + total_docs) / (1 + doc_freq.get(key, 0))) + 1 for key in self.keys])
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_database(cls):
+        """Seed skills plus every skill stored in ResumeSkill, with document frequencies."""
+        from models import db, AnalysisResult, ResumeSkill
+
+        rows = (db.session.query(ResumeSkill.name_key, db.func.min(ResumeSkill.name),
+                                 db.func.count(db.distinct(ResumeSkill.analysis_id)))
+                .group_by(ResumeSkill.name_key).all())
+        total = db.session.query(db.func.count(AnalysisResult.id)).scalar() or 0
+        doc_freq = {}
+        for name_key, name, count in rows:
+            key = skill_key(name_key)
+            doc_freq[key] = doc_freq.get(key, 0) + count
+        return cls(SEED_SKILLS + [name for _, name, _ in rows], doc_freq, total)
+
+    def counts(self, text):
+        """Counter of skill index -> occurrences in `text` (multi-word skills matched as phrases)."""
+        tokens = tokenize(text)
+        words = Counter(tokens)
+        index = self.index
+        found = Counter({index[word]: count for word, count in words.items() if word in index})
+        # Only walk the tokens when a multi-word skill could start here
+        prefixes = self.prefixes.intersection(words)
+        if prefixes:
+            for i, token in enumerate(tokens):
+                if token in prefixes:
+                    for n in range(2, MAX_SKILL_WORDS + 1):
+                        position = index.get(" ".join(tokens[i:i + n]))
+                        if position is not None:
+                            found[position] += 1
+        return found
+
+    def vectorize(self, texts):
+        """TF-IDF rows (log-scaled term frequency) for `texts` as a SparseRows matrix."""
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            found = self.counts(text)
+            indices.extend(found.keys())
+            data.extend(found.values())
+            indptr.append(len(indices))
+        indices = np.array(indices, dtype=np.int64)
+        data = (1.0 + np.log(np.array(data, dtype=np.float64))) * self.idf[indices]
+        return SparseRows(np.array(indptr, dtype=np.int64), indices, data, len(self))
+
+    def dense(self, text):
+        rows = self.vectorize([text])
+        vector = np.zeros(len(self))
+        vector[rows.indices] = rows.data
+        return vector
+
+
+def score_jobs(resume_text, job_texts, vocabulary):
+    """
+    Cosine similarity (0-1) between the resume and each job description, computed for
+    all jobs at once on the sparse job matrix. Returns (scores, job_matrix, resume_vector).
+    """
+    resume = vocabulary.dense(resume_text)
+    jobs = vocabulary.vectorize(job_texts)
+    return cosine_scores(jobs, resume), jobs, resume
+
+
+def cosine_scores(jobs, resume):
+    """Row-wise cosine of a SparseRows matrix against a dense vector, without a Python loop."""
+    rows = jobs.row_ids()
+    n = jobs.shape[0]
+    dots = np.bincount(rows, weights=jobs.data * resume[jobs.indices], minlength=n)
+    norms = np.sqrt(np.bincount(rows, weights=jobs.data ** 2, minlength=n)) * np.linalg.norm(resume)
+    return np.divide(dots, norms, out=np.zeros(n), where=norms > 0)
+
+
+def match_job(resume_text, job_description, vocabulary, max_missing=10):
+    """
+    Instant local pre-check: match score (0-100), skills the job asks for that the
+    resume shows, and the missing ones ordered by weight.
+    """
+    scores, jobs, resume = score_jobs(resume_text, [job_description], vocabulary)
+    indices, weights = jobs.row(0)
+    order = np.argsort(-weights, kind="stable")
+    matched = [vocabulary.names[indices[i]] for i in order if resume[indices[i]] > 0]
+    missing = [vocabulary.names[indices[i]] for i in order if resume[indices[i]] == 0]
+    return {
+        "score": int(round(scores[0] * 100)),
+        "matched": matched,
+        "missing": missing[:max_missing],
+        "job_skills": len(indices),
+    }
+
+
+_vocabulary = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def get_vocabulary():
+    """The database vocabulary, reloaded at most every SKILL_VOCAB_TTL seconds (needs an app context)."""
+    global _vocabulary, _loaded_at
+    with _lock:
+        if _vocabulary is None or time.monotonic() - _loaded_at > SKILL_VOCAB_TTL:
+            _vocabulary = SkillVocabulary.from_database()
+            _loaded_at = time.monotonic()
+        return _vocabulary